@@ -1,78 +1,133 @@
-import math
 from boid import Boid, Genome
-import random
+import numpy as np
 
 def breed(population: list[Boid]):
-    parents = selection(population, type(population[0])._selection_type)
-    child = crossover(parents, type(population[0])._crossover_type)
-    mutation(child, type(population[0])._mutation_rate)
-    return child
+    return breed_batch(population, 1)[0]
 
-def selection(population: list[Boid], selection_type: str) -> tuple[Boid, Boid]:
+def breed_batch(population: list[Boid], k: int, fitness: np.ndarray = None, with_parents: bool = False):
+    """
+    Breeds k children at once. Fitness is evaluated a single time (or passed in),
+    all 2k parents are drawn in one batched selection, and the children's genomes
+    come out of one crossover and one mutation over packed (k, genes) arrays.
+    With with_parents, returns (children, (k, 2) array of the parents' indices in population).
+    """
+    if k == 0:
+        return ([], np.empty((0, 2), dtype=np.int64)) if with_parents else []
+
+    if fitness is None:
+        fitness = fitness_vector(population)
+
+    boid_type = type(population[0])
+    genome_type = type(population[0].genome)
+    parents = select_parents(fitness, k, boid_type._selection_type, boid_type._tournament_size)
+
+    first = [population[i] for i in parents[:, 0].tolist()]
+    second = [population[i] for i in parents[:, 1].tolist()]
+
+    genes = breed_genes(Genome.pack([p.genome for p in first]), Genome.pack([p.genome for p in second]),
+                        boid_type._crossover_type, boid_type._mutation_rate)
+    xs, ys = child_positions(k, boid_type._world_bounds)
+
+    children = [
+        boid_type(x=x, y=y, vx=p1.vx, vy=p1.vy, genome=genome_type.from_array(row))
+        for x, y, p1, row in zip(xs.tolist(), ys.tolist(), first, genes)
+    ]
+    return (children, parents) if with_parents else children
+
+def breed_genes(first: np.ndarray, second: np.ndarray, crossover_type: str, mutation_rate: float) -> np.ndarray:
+    """
+    Children of row-wise parent pairs, one (k, genes) array in and out per parent
+    """
+    return mutate_genes(crossover_genes(first, second, crossover_type), mutation_rate)
+
+def child_positions(k: int, world_bounds) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Children start somewhere random in the world
+    """
+    xs = np.random.uniform(world_bounds[0][0], world_bounds[0][1], size=k)
+    ys = np.random.uniform(world_bounds[1][0], world_bounds[1][1], size=k)
+    return xs, ys
+
+def fitness_vector(population: list[Boid]) -> np.ndarray:
+    return np.array([p.get_fitness() for p in population], dtype=np.float64)
+
+def selection(population: list[Boid], selection_type: str, tournament_size: int = 3) -> tuple[Boid, Boid]:
+    i1, i2 = select_parents(fitness_vector(population), 1, selection_type, tournament_size)[0]
+    return (population[i1], population[i2])
+
+def select_parents(fitness: np.ndarray, k: int, selection_type: str, tournament_size: int = 3) -> np.ndarray:
+    """
+    Indices of k parent pairs as a (k, 2) array
+    """
     match(selection_type):
         case "roulette":
-            return roulette_selection(population)
-
-def roulette_selection(population: list[Boid]) -> tuple[Boid, Boid]:
-    weights = []
-    total_fitness = 0
-    for p in population:
-        w = p.get_fitness()
-        weights.append(w)
-        total_fitness += w
-
-    for w in range(len(weights)):
-        weights[w] = weights[w] / total_fitness # Normalize the total_fitness
-    
-    def select(population, weights):
-        rand_select = random.random()
-        accumulate = 0
-        
-        for w in range(len(weights)):
-            accumulate += weights[w]
-            if accumulate >= rand_select:
-                return population[w]
-        
-        return population[0]
-
-    p1 = select(population, weights)
-    p2 = select(population, weights)
-
-    return (p1, p2)
+            return roulette_selection(fitness, k)
+        case "tournament":
+            return tournament_selection(fitness, k, tournament_size)
+        case "rank":
+            return rank_selection(fitness, k)
 
-def crossover(parents: tuple[Boid, Boid], crossover_type: str):
-    match(crossover_type):
-        case 'bit-mask':
-            return bit_mask_crossover(parents)
+    raise ValueError(f"Unknown selection type: {selection_type}")
 
-def bit_mask_crossover(parents: tuple[Boid, Boid]):
-    p1 = parents[0]
-    p2 = parents[1]
+def roulette_selection(fitness: np.ndarray, k: int) -> np.ndarray:
+    """
+    Fitness proportionate: one cumulative sum, then a binary search per parent
+    """
+    cumulative = np.cumsum(fitness)
+    total = cumulative[-1]
 
-    genetic_makeup = vars(p1.genome)
-    gene_names = list(genetic_makeup.keys())
-    
-    b1 = [random.randint(0, 1) for _ in range(len(genetic_makeup))]
-    
-    genome_dict = {}
+    if total <= 0: # Nobody has any fitness yet, everyone is equally likely
+        return np.random.randint(0, len(fitness), size=(k, 2))
 
-    for i, gene_name in enumerate(gene_names):
-        if b1[i] == 1:
-            genome_dict[gene_name] = getattr(p1.genome, gene_name)
-        else:
-            genome_dict[gene_name] = getattr(p2.genome, gene_name) 
-    child = type(p1)(x = random.uniform(p1._world_bounds[0][0], p1._world_bounds[0][1]),
-                y = random.uniform(p2._world_bounds[1][0], p2._world_bounds[1][1]),
-                vx = p1.vx,
-                vy = p1.vy,
-                genome = type(p1.genome)(**genome_dict))
+    draws = np.random.random(2 * k) * total
+    parents = np.searchsorted(cumulative, draws, side='right') # Boids with 0 fitness are never picked
+    return np.minimum(parents, len(fitness) - 1).reshape(k, 2)
 
-    return child
+def tournament_selection(fitness: np.ndarray, k: int, tournament_size: int = 3) -> np.ndarray:
+    """
+    Each parent is the fittest of tournament_size boids picked at random
+    """
+    entrants = np.random.randint(0, len(fitness), size=(2 * k, tournament_size))
+    winners = entrants[np.arange(2 * k), np.argmax(fitness[entrants], axis=1)]
+    return winners.reshape(k, 2)
 
+def rank_selection(fitness: np.ndarray, k: int) -> np.ndarray:
+    """
+    Roulette over fitness rank (1 = least fit) instead of raw fitness, so a few
+    very fit boids can't take over selection
+    """
+    ranks = np.empty(len(fitness))
+    ranks[np.argsort(fitness, kind='stable')] = np.arange(1, len(fitness) + 1)
+    return roulette_selection(ranks, k)
 
-def mutation(child, mutation_rate):
-    check = random.random()
-    if check <= mutation_rate:
-        child.genome = child.genome.vary_genome(mutation_rate)
+def crossover(parents: tuple[Boid, Boid], crossover_type: str):
+    p1, p2 = parents
+    genes = crossover_genes(p1.genome.to_array()[None, :], p2.genome.to_array()[None, :], crossover_type)
+    xs, ys = child_positions(1, p1._world_bounds)
+
+    return type(p1)(x=float(xs[0]), y=float(ys[0]), vx=p1.vx, vy=p1.vy, genome=type(p1.genome).from_array(genes[0]))
 
+def crossover_genes(first: np.ndarray, second: np.ndarray, crossover_type: str) -> np.ndarray:
+    match(crossover_type):
+        case 'bit-mask':
+            return bit_mask_crossover(first, second)
+
+    raise ValueError(f"Unknown crossover type: {crossover_type}")
+
+def bit_mask_crossover(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Every gene of every child comes from either parent with equal odds
+    """
+    mask = np.random.randint(0, 2, size=first.shape).astype(bool)
+    return np.where(mask, first, second)
+
+def mutation(child, mutation_rate):
+    child.genome = type(child.genome).from_array(mutate_genes(child.genome.to_array()[None, :], mutation_rate)[0])
 
+def mutate_genes(genes: np.ndarray, mutation_rate: float) -> np.ndarray:
+    """
+    With chance mutation_rate a child has every gene scaled by 1 +- mutation_rate
+    """
+    mutated = np.random.random(len(genes)) <= mutation_rate
+    noise = 1 + np.random.uniform(-mutation_rate, mutation_rate, size=genes.shape)
+    return np.where(mutated[:, None], genes * noise, genes)
@@ -0,0 +1,309 @@
+from world import simulation_from_config, run_history
+from sweep import load_config, apply_overrides
+from Genetic_Algorithm import breed_batch
+import numpy as np
+import tracemalloc
+import gc
+import math
+import subprocess
+import platform
+import argparse
+import json
+import time
+import sys
+
+# Times the simulation at a range of population sizes so speedups and regressions
+# in prey.py, predator.py and Genetic_Algorithm.py can be compared across commits.
+#
+# ex. python3 benchmark.py --prey 100 500 2000 --predators 10 50 --engines object vector
+#     python3 benchmark.py compare old_report.json new_report.json
+
+def build(config, engine, prey, predators, seed):
+    overrides = {'World_Values.prey_pop_size': str(prey), 'World_Values.predator_pop_size': str(predators)}
+    return simulation_from_config(apply_overrides(config, overrides), engine, seed)
+
+def time_ticks(sim, ticks: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        sim.tick()
+    return time.perf_counter() - start_time
+
+def time_neighbor_queries(sim) -> float:
+    """
+    One tick's worth of flocking neighbor lookups plus the predators' nearest prey search,
+    done the way the simulation steers (for the Numba kernel that's the whole prey steering loop)
+    """
+    start_time = time.perf_counter()
+
+    if sim.engine == 'object':
+        grid = sim.build_prey_grid()
+        prey = sim.prey_population
+        if grid is not None:
+            for p in prey:
+                grid.query(p.x, p.y, p.genome.visual_range)
+            for pred in sim.pred_population:
+                grid.nearest(pred.x, pred.y, sim.prey_state.x, sim.prey_state.y)
+        else:
+            for p in prey:
+                for other in prey:
+                    math.dist([p.x, p.y], [other.x, other.y])
+    elif sim.compiled_kernel is not None:
+        # The Numba kernel does the neighbor search and the rest of prey steering in one loop, time all of it
+        if sim.workers > 1:
+            sim.in_tiles(sim.compiled_steer, 4)
+        else:
+            everyone = np.arange(sim.prey_count())
+            sim.compiled_steer(everyone, everyone)
+    elif sim.workers > 1:
+        sim.in_tiles(sim.neighbor_sums, 7)
+    else:
+        sim.neighbor_sums()
+
+    return time.perf_counter() - start_time
+
+def neighbor_path(sim) -> str:
+    """
+    Which neighbor search time_neighbor_queries timed
+    """
+    if sim.engine == 'object':
+        return sim.neighbor_search
+    path = 'numba' if sim.compiled_kernel is not None else 'numpy'
+    return f"{path} x{sim.workers}" if sim.workers > 1 else path
+
+def time_breeding(sim, children: int) -> float:
+    """
+    Breeds children without adding them, so the population is left untouched
+    """
+    start_time = time.perf_counter()
+
+    if sim.engine == 'object':
+        breed_batch(sim.prey_population, children)
+    else:
+        sim.breed(children)
+
+    return time.perf_counter() - start_time
+
+def warm_up(config, engine):
+    """
+    Builds and ticks a tiny simulation and throws it away, so the lazy imports (the
+    vector engine, Numba) and kernel compilation aren't charged to whatever is traced next
+    """
+    build(config, engine, 2, 1, 0).tick()
+
+def peak_memory(config, engine, prey, predators, seed, ticks: int) -> tuple[int, int]:
+    """
+    Peak traced bytes while building the simulation, and while running a few ticks
+    of it. They're kept apart because the vector engine is built by packing a full
+    object engine Simulation, so its build peak is the object engine's.
+    """
+    warm_up(config, engine)
+    tracemalloc.start()
+    sim = build(config, engine, prey, predators, seed)
+    _, build_peak = tracemalloc.get_traced_memory()
+
+    gc.collect() # Drop what building left behind, e.g. the object populations the vector engine packs
+    tracemalloc.reset_peak()
+    time_ticks(sim, ticks)
+    _, tick_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return build_peak, tick_peak
+
+def memory_per_agent(config, engine, prey, seed) -> float:
+    """
+    Bytes held per prey once a simulation of that size is built (no predators)
+    """
+    warm_up(config, engine)
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    sim = build(config, engine, prey, 0, seed)
+    gc.collect() # Drop anything left over from building, e.g. the object populations the vector engine packs
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del sim
+    return (current - base) / prey
+
+def precision_case(config, prey, predators, ticks, seed) -> dict:
+    """
+    Runs the vector engine in float64 and float32 from the same seed. Reports the
+    float32 throughput and memory gain and how far its gene averages drift from float64's.
+    """
+    runs = {}
+    for precision in ('float64', 'float32'):
+        precise = apply_overrides(config, {'World_Values.precision': precision})
+        sim = build(precise, 'vector', prey, predators, seed)
+        sim.tick() # Warm up
+
+        start_time = time.perf_counter()
+        history = run_history(sim, ticks)
+        elapsed = time.perf_counter() - start_time
+
+        runs[precision] = {
+            'ticks_per_second': ticks / elapsed,
+            'bytes_per_agent': memory_per_agent(precise, 'vector', prey, seed),
+            'history': {name: np.array(values) for name, values in history.items()},
+        }
+
+    wide, narrow = runs['float64'], runs['float32']
+    # Relative difference of each gene average, over the whole run and at the end
+    drift = {name: np.abs(narrow['history'][name] - values) / np.maximum(np.abs(values), 1e-12)
+             for name, values in wide['history'].items()}
+    worst = max(drift, key=lambda name: drift[name].max())
+
+    return {
+        'prey': prey,
+        'predators': predators,
+        'ticks': ticks,
+        'seed': seed,
+        'float64_ticks_per_second': wide['ticks_per_second'],
+        'float32_ticks_per_second': narrow['ticks_per_second'],
+        'speedup': narrow['ticks_per_second'] / wide['ticks_per_second'],
+        'float64_bytes_per_agent': wide['bytes_per_agent'],
+        'float32_bytes_per_agent': narrow['bytes_per_agent'],
+        'max_drift': float(drift[worst].max()),
+        'max_drift_gene': worst,
+        'mean_final_drift': float(np.mean([values[-1] for values in drift.values()])),
+    }
+
+def startup_time(statement: str, runs: int = 5) -> float:
+    """
+    Median wall time for a fresh interpreter to run statement, start up included
+    """
+    times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True)
+        times.append(time.perf_counter() - start_time)
+    return sorted(times)[len(times) // 2]
+
+def startup_report(runs: int = 5):
+    """
+    What a short headless run pays before simulating, next to what plotting would add
+    """
+    cases = {
+        'interpreter': 'pass',
+        'import world': 'import world',
+        'world + 1 object tick': "import world, sweep; world.simulation_from_config(sweep.load_config('config.ini'), 'object').tick()",
+        'world + 1 vector tick': "import world, sweep; world.simulation_from_config(sweep.load_config('config.ini'), 'vector').tick()",
+        'world + matplotlib': 'import world, matplotlib.pyplot',
+    }
+    for name, statement in cases.items():
+        print(f"{name:<24}{startup_time(statement, runs) * 1e3:9.1f} ms")
+
+def bench_case(config, engine, prey, predators, ticks, seed) -> dict:
+    sim = build(config, engine, prey, predators, seed)
+    sim.tick() # Warm up
+
+    elapsed = time_ticks(sim, ticks)
+    neighbor_time = time_neighbor_queries(sim)
+    breed_time = time_breeding(sim, max(1, predators))
+    build_peak, tick_peak = peak_memory(config, engine, prey, predators, seed, min(ticks, 3))
+
+    return {
+        'engine': engine,
+        'prey': prey,
+        'predators': predators,
+        'ticks': ticks,
+        'seed': seed,
+        'ticks_per_second': ticks / elapsed,
+        'seconds_per_tick': elapsed / ticks,
+        'neighbor_query_seconds': neighbor_time,
+        'neighbor_path': neighbor_path(sim),
+        'breed_seconds_per_child': breed_time / max(1, predators),
+        'build_peak_memory_bytes': build_peak,
+        'peak_memory_bytes': tick_peak, # While ticking, the build peak is separate above
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(config, engines, prey_sizes, predator_sizes, ticks, seed) -> dict:
+    cases = []
+    for engine in engines:
+        for prey in prey_sizes:
+            for predators in predator_sizes:
+                case = bench_case(config, engine, prey, predators, ticks, seed)
+                print(f"{engine:>7} prey={prey:<6} predators={predators:<5} "
+                      f"{case['ticks_per_second']:10.2f} ticks/s  "
+                      f"neighbors {case['neighbor_query_seconds'] * 1e3:9.3f} ms ({case['neighbor_path']})  "
+                      f"breed {case['breed_seconds_per_child'] * 1e6:9.1f} us/child  "
+                      f"peak {case['peak_memory_bytes'] / 2**20:8.2f} MiB (build {case['build_peak_memory_bytes'] / 2**20:8.2f} MiB)")
+                cases.append(case)
+
+    return {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cases': cases,
+    }
+
+def compare(old_path: str, new_path: str):
+    """
+    Prints new/old tick throughput for every case that appears in both reports
+    """
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    key = lambda case: (case['engine'], case['prey'], case['predators'])
+    old_cases = {key(case): case for case in old['cases']}
+
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for case in new['cases']:
+        before = old_cases.get(key(case))
+        if before is None:
+            continue
+        speedup = case['ticks_per_second'] / before['ticks_per_second']
+        print(f"{case['engine']:>7} prey={case['prey']:<6} predators={case['predators']:<5} {speedup:6.2f}x ticks/s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        compare(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'precision':
+        # ex. python3 benchmark.py precision 1000 5000
+        config = load_config('config.ini')
+        for prey in [int(n) for n in sys.argv[2:]] or [1000, 5000]:
+            case = precision_case(config, prey, 10, 200, 0)
+            print(f"prey={prey:<6} float32 {case['speedup']:5.2f}x ticks/s  "
+                  f"{case['float64_bytes_per_agent']:7.1f} -> {case['float32_bytes_per_agent']:7.1f} bytes/agent  "
+                  f"gene average drift: max {case['max_drift']:.2e} ({case['max_drift_gene']}), "
+                  f"mean at end {case['mean_final_drift']:.2e}")
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'startup':
+        # ex. python3 benchmark.py startup
+        startup_report()
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'memory':
+        # ex. python3 benchmark.py memory 10000 100000
+        config = load_config('config.ini')
+        for engine in ('object', 'vector'):
+            for prey in [int(n) for n in sys.argv[2:]] or [10000, 100000]:
+                print(f"{engine:>7} prey={prey:<7} {memory_per_agent(config, engine, prey, 0):10.1f} bytes/agent")
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark tick throughput across population sizes")
+    parser.add_argument('--prey', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--predators', type=int, nargs='+', default=[10])
+    parser.add_argument('--engines', nargs='+', default=['object', 'vector'])
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--config', default='config.ini')
+    parser.add_argument('--out', default='benchmark_report.json')
+    args = parser.parse_args()
+
+    report = run_benchmarks(load_config(args.config), args.engines, args.prey, args.predators, args.ticks, args.seed)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
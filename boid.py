@@ -2,10 +2,12 @@ from dataclasses import dataclass
 from typing import ClassVar, TypedDict, Tuple
 import random
 import math
+import numpy as np
 from abc import ABC, abstractmethod
 
 @dataclass
 class Genome(ABC):
+    __slots__ = () # Genome types are declared with @dataclass(slots=True), so no per genome __dict__
     def vary_genome(self, rate) -> "Genome":
         """
         Randomly varies each field by +- range
@@ -17,23 +19,150 @@ class Genome(ABC):
             }
         )
 
+    def values(self) -> list[float]:
+        """
+        Gene values in field order
+        """
+        return [getattr(self, field) for field in self.__dataclass_fields__]
+
+    def to_array(self) -> np.ndarray:
+        return np.array(self.values(), dtype=np.float64)
+
+    @classmethod
+    def from_array(cls, values) -> "Genome":
+        """
+        Builds a genome from a packed row of gene values in field order
+        """
+        return cls(*np.asarray(values, dtype=np.float64).tolist())
+
+    @staticmethod
+    def pack(genomes: list["Genome"]) -> np.ndarray:
+        """
+        Packs genomes of one type into a (len(genomes), genes) array
+        """
+        if not genomes:
+            return np.empty((0, 0))
+        return np.array([g.values() for g in genomes], dtype=np.float64)
+
+class State_Buffer:
+    """
+    Positions and velocities of a whole population as parallel lists, double buffered.
+
+    During a tick every boid reads the current lists and writes its new state into
+    the next_* lists, then swap() makes next current for everyone at once by
+    swapping list references, no copying or per boid pass needed.
+    """
+    __slots__ = ('x', 'y', 'vx', 'vy', 'next_x', 'next_y', 'next_vx', 'next_vy')
+
+    def __init__(self):
+        self.x: list[float] = []
+        self.y: list[float] = []
+        self.vx: list[float] = []
+        self.vy: list[float] = []
+        self.next_x: list[float] = []
+        self.next_y: list[float] = []
+        self.next_vx: list[float] = []
+        self.next_vy: list[float] = []
+
+    @classmethod
+    def from_boids(cls, boids: list["Boid"]) -> "State_Buffer":
+        buffer = cls()
+        buffer.adopt(boids)
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def append(self, x: float, y: float, vx: float, vy: float) -> int:
+        for values, v in ((self.x, x), (self.y, y), (self.vx, vx), (self.vy, vy),
+                          (self.next_x, x), (self.next_y, y), (self.next_vx, vx), (self.next_vy, vy)):
+            values.append(v)
+        return len(self.x) - 1
+
+    def adopt(self, boids: list["Boid"]):
+        """
+        Moves each boid's state to the end of this buffer and points the boid at it
+        """
+        for b in boids:
+            index = self.append(b.x, b.y, b.vx, b.vy)
+            b.state = self
+            b.index = index
+
+    def place(self, index: int, boid: "Boid"):
+        """
+        Moves boid's state into an existing slot, overwriting whoever held it
+        """
+        x, y, vx, vy = boid.x, boid.y, boid.vx, boid.vy
+        self.x[index] = self.next_x[index] = x
+        self.y[index] = self.next_y[index] = y
+        self.vx[index] = self.next_vx[index] = vx
+        self.vy[index] = self.next_vy[index] = vy
+        boid.state = self
+        boid.index = index
+
+    def swap(self):
+        self.x, self.next_x = self.next_x, self.x
+        self.y, self.next_y = self.next_y, self.y
+        self.vx, self.next_vx = self.next_vx, self.vx
+        self.vy, self.next_vy = self.next_vy, self.vy
+
 class Boid(ABC):
+    # Slotted to keep per boid memory down. Position and velocity live at index in a
+    # State_Buffer shared by the population, a new boid gets a buffer of its own
+    # until a population adopts it.
+    __slots__ = ('state', 'index', 'age', 'genome')
     _max_speed: ClassVar[float] = 10 # Global Speed Limit for Boids
     _world_bounds: ClassVar[Tuple[Tuple[float, float], Tuple[float, float]]] = ((-150, 150), (-150, 150))
     _selection_type: ClassVar[str] = "roulette"
     _mutation_rate: ClassVar[float] = 0.15
     _crossover_type: ClassVar[str] = "bit-mask"
+    _tournament_size: ClassVar[int] = 3
 
     def __init__(self, x, y, vx, vy, genome: Genome):
         # General
-        self.x: float = x
-        self.y: float = y
-        self.vx: float = vx
-        self.vy: float = vy
+        self.state: State_Buffer = State_Buffer()
+        self.index: int = self.state.append(x, y, vx, vy)
         self.age: int = 0
         self.genome: Genome = genome
 
-        self.update_dict = {}
+    @property
+    def x(self) -> float:
+        return self.state.x[self.index]
+
+    @x.setter
+    def x(self, value: float):
+        self.state.x[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return self.state.y[self.index]
+
+    @y.setter
+    def y(self, value: float):
+        self.state.y[self.index] = value
+
+    @property
+    def vx(self) -> float:
+        return self.state.vx[self.index]
+
+    @vx.setter
+    def vx(self, value: float):
+        self.state.vx[self.index] = value
+
+    @property
+    def vy(self) -> float:
+        return self.state.vy[self.index]
+
+    @vy.setter
+    def vy(self, value: float):
+        self.state.vy[self.index] = value
+
+    def set_next(self, x: float, y: float, vx: float, vy: float):
+        state, i = self.state, self.index
+        state.next_x[i] = x
+        state.next_y[i] = y
+        state.next_vx[i] = vx
+        state.next_vy[i] = vy
        
     @abstractmethod
     def get_update_vals(self, world):
@@ -44,10 +173,14 @@ class Boid(ABC):
         pass
 
     def update_vals(self):
-        self.x = self.update_dict['new_x']
-        self.y = self.update_dict['new_y']
-        self.vx = self.update_dict['new_vx']
-        self.vy = self.update_dict['new_vy']
+        """
+        Applies just this boid's next state. Simulation swaps whole buffers instead.
+        """
+        state, i = self.state, self.index
+        state.x[i] = state.next_x[i]
+        state.y[i] = state.next_y[i]
+        state.vx[i] = state.next_vx[i]
+        state.vy[i] = state.next_vy[i]
 
     @classmethod
     def set_max_speed(cls, speed: float):
@@ -60,3 +193,15 @@ class Boid(ABC):
     @classmethod
     def set_selection_type(cls, selection_type: str):
         cls._selection_type = selection_type
+
+    @classmethod
+    def set_mutation_rate(cls, rate: float):
+        cls._mutation_rate = rate
+
+    @classmethod
+    def set_tournament_size(cls, size: int):
+        cls._tournament_size = size
+
+    @classmethod
+    def set_crossover_type(cls, crossover_type: str):
+        cls._crossover_type = crossover_type
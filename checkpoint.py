@@ -0,0 +1,154 @@
+from prey import Prey, Prey_Genome
+from predator import Predator, Predator_Genome
+import numpy as np
+import random
+import json
+import os
+
+# Snapshots a running simulation (either engine) into a single .npz of flat arrays:
+# boid state, genomes, the running gene sums, both RNG states and the gene history
+# so far. Loading it rebuilds the simulation from its saved config and overwrites
+# the state, so the resumed run continues bit for bit like the original would have.
+
+def save_checkpoint(sim, path: str, history=None):
+    """
+    Writes sim (plus the history collected so far) to path. The file is written
+    next to path first and moved into place, so a crash mid-write keeps the old one.
+    """
+    if sim.engine == 'object':
+        state = object_state(sim)
+    else:
+        state = vector_state(sim)
+
+    rng_version, rng_internal, rng_gauss = random.getstate()
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+
+    shift, sums, sums_sq = sim.gene_stats.shift, sim.gene_stats.sum, sim.gene_stats.sum_sq
+
+    history_names, history_rows = history_array(history)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            engine=np.array(sim.engine),
+            config=np.array(json.dumps(sim.config)),
+            tick_count=np.array(sim.tick_count),
+            rng_version=np.array(rng_version),
+            rng_internal=np.array(rng_internal, dtype=np.int64),
+            rng_gauss=np.array(np.nan if rng_gauss is None else rng_gauss),
+            np_rng_keys=np_keys,
+            np_rng_pos=np.array(np_pos),
+            np_rng_gauss=np.array([np_has_gauss, np_gauss], dtype=np.float64),
+            gene_shift=shift,
+            gene_sum=sums,
+            gene_sum_sq=sums_sq,
+            history_names=np.array(history_names, dtype=str),
+            history=history_rows,
+            prey_ids=np.asarray(sim.prey_ids, dtype=np.int64),
+            next_prey_id=np.array(sim.next_prey_id),
+            **state
+        )
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path: str):
+    """
+    Returns (sim, history) restored from a file written by save_checkpoint
+    """
+    # Imported here, world imports this module for its checkpointing runs
+    from world import simulation_from_config
+
+    with np.load(path) as data:
+        data = {name: data[name] for name in data.files}
+
+    engine = str(data['engine'])
+    sim = simulation_from_config(json.loads(str(data['config'])), engine)
+    sim.tick_count = int(data['tick_count'])
+
+    if engine == 'object':
+        restore_object_state(sim, data)
+    else:
+        restore_vector_state(sim, data)
+
+    sim.gene_stats.restore_sums(data['gene_shift'], data['gene_sum'], data['gene_sum_sq'])
+
+    # Checkpoints from before prey had ids number them by slot
+    prey_ids = data['prey_ids'] if 'prey_ids' in data else np.arange(sim.prey_count(), dtype=np.int64)
+    sim.prey_ids = prey_ids.tolist() if engine == 'object' else prey_ids.copy()
+    sim.next_prey_id = int(data['next_prey_id']) if 'next_prey_id' in data else sim.prey_count()
+
+    # RNGs last, building the simulation above draws from them
+    gauss = float(data['rng_gauss'])
+    random.setstate((int(data['rng_version']), tuple(int(v) for v in data['rng_internal']), None if np.isnan(gauss) else gauss))
+    np_has_gauss, np_gauss = data['np_rng_gauss']
+    np.random.set_state(('MT19937', data['np_rng_keys'], int(data['np_rng_pos']), int(np_has_gauss), float(np_gauss)))
+
+    history = {str(name): data['history'][k].tolist() for k, name in enumerate(data['history_names'])}
+
+    return sim, history
+
+def history_array(history) -> tuple[list[str], np.ndarray]:
+    """
+    {gene: values} -> (gene names, (genes, ticks) array). No history (the default
+    when checkpointing a fresh run) gives an empty (0, 0) array, reshape can't infer
+    the tick count from zero rows.
+    """
+    names = list(history or {})
+    if not names:
+        return names, np.empty((0, 0))
+    return names, np.array([history[name] for name in names], dtype=np.float64).reshape(len(names), -1)
+
+def object_state(sim) -> dict[str, np.ndarray]:
+    prey = sim.prey_population
+    preds = sim.pred_population
+    return {
+        'prey_state': np.array([(p.x, p.y, p.vx, p.vy) for p in prey], dtype=np.float64).reshape(-1, 4),
+        'prey_age': np.array([p.age for p in prey], dtype=np.int64),
+        'prey_genes': np.array([p.genome.values() for p in prey], dtype=np.float64).reshape(len(prey), len(sim.gene_names)),
+        'pred_state': np.array([(p.x, p.y, p.vx, p.vy) for p in preds], dtype=np.float64).reshape(-1, 4),
+        'pred_age': np.array([p.age for p in preds], dtype=np.int64),
+        'pred_kills': np.array([p.kills for p in preds], dtype=np.int64),
+        'pred_genes': np.array([p.genome.values() for p in preds], dtype=np.float64).reshape(len(preds), len(Predator_Genome.__dataclass_fields__)),
+    }
+
+def vector_state(sim) -> dict[str, np.ndarray]:
+    return {
+        'prey_state': np.column_stack((sim.x, sim.y, sim.vx, sim.vy)),
+        'prey_age': sim.age,
+        'prey_genes': sim.genes.T,
+        'pred_state': np.column_stack((sim.px, sim.py, sim.pvx, sim.pvy)),
+        'pred_age': sim.page,
+        'pred_kills': sim.pkills,
+        'pred_genes': sim.pred_genes.T,
+    }
+
+def make_boids(boid_type, genome_type, state, ages, genes) -> list:
+    boids = []
+    for (x, y, vx, vy), age, genome in zip(state.tolist(), ages.tolist(), genes.tolist()):
+        boid = boid_type(x=x, y=y, vx=vx, vy=vy, genome=genome_type(*genome))
+        boid.age = age
+        boids.append(boid)
+    return boids
+
+def restore_object_state(sim, data):
+    # Fill the existing lists in place, sim.world holds references to them
+    sim.prey_population[:] = make_boids(Prey, Prey_Genome, data['prey_state'], data['prey_age'], data['prey_genes'])
+    sim.pred_population[:] = make_boids(Predator, Predator_Genome, data['pred_state'], data['pred_age'], data['pred_genes'])
+    for pred, kills in zip(sim.pred_population, data['pred_kills'].tolist()):
+        pred.kills = kills
+    sim.rebuild_state_buffers()
+
+    sim.gene_stats.rebuild(data['prey_genes'])
+
+def restore_vector_state(sim, data):
+    # Cast to the precision the simulation was built with from the saved config
+    sim.x, sim.y, sim.vx, sim.vy = (np.ascontiguousarray(col, dtype=sim.dtype) for col in data['prey_state'].T)
+    sim.age = data['prey_age'].copy()
+    sim.genes = np.ascontiguousarray(data['prey_genes'].T, dtype=sim.dtype)
+
+    sim.px, sim.py, sim.pvx, sim.pvy = (np.ascontiguousarray(col, dtype=sim.dtype) for col in data['pred_state'].T)
+    sim.page = data['pred_age'].copy()
+    sim.pkills = data['pred_kills'].copy()
+    sim.pred_genes = np.ascontiguousarray(data['pred_genes'].T, dtype=sim.dtype)
+
+    sim.gene_stats.rebuild(data['prey_genes'])
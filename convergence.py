@@ -0,0 +1,66 @@
+from collections import deque
+import numpy as np
+
+# Below this a gene's variance counts as zero, so a population that has collapsed
+# onto one value has to hold it exactly to count as settled
+_VARIANCE_FLOOR = 1e-12
+
+class Convergence_Monitor:
+    """
+    Decides when a run's gene averages have stopped changing, from the per tick
+    population mean and variance of every gene.
+
+    Ticks are averaged in windows of window ticks. Two windows agree when, for every
+    gene, the mean differs by at most tolerance of the gene's standard deviation and
+    the variance by at most tolerance of itself. The run has converged once the last
+    patience windows each agree with the one before and the newest still agrees with
+    the window before all of them, so a slow steady trend can't pass one small step
+    at a time, and no earlier than min_ticks. stop_tick is the tick it happened on,
+    None until then.
+    """
+
+    def __init__(self, gene_names: list[str], window: int, tolerance: float, patience: int = 3, min_ticks: int = 0):
+        if window < 1:
+            raise ValueError(f"Convergence window should be at least 1 tick, not {window}")
+        if patience < 1:
+            raise ValueError(f"Convergence patience should be at least 1 window, not {patience}")
+
+        self.gene_names = list(gene_names)
+        self.window = window
+        self.tolerance = tolerance
+        self.patience = patience
+        self.min_ticks = min_ticks
+
+        self.sums = np.zeros((2, len(self.gene_names))) # Means and variances summed over the current window
+        self.filled = 0
+        self.windows: deque = deque(maxlen=patience + 1) # Averages of the latest full windows
+        self.settled = 0 # Consecutive windows that agreed with the one before
+        self.stop_tick: int | None = None
+
+    def agree(self, previous: np.ndarray, current: np.ndarray) -> bool:
+        variance = np.maximum(previous[1], _VARIANCE_FLOOR)
+        return bool(np.all((np.abs(current[0] - previous[0]) <= self.tolerance * np.sqrt(variance))
+                           & (np.abs(current[1] - previous[1]) <= self.tolerance * variance)))
+
+    def update(self, tick: int, means: dict[str, float], variances: dict[str, float]) -> bool:
+        """
+        Adds one tick's statistics, True once the run has converged
+        """
+        self.sums[0] += [means[name] for name in self.gene_names]
+        self.sums[1] += [variances[name] for name in self.gene_names]
+        self.filled += 1
+        if self.filled < self.window:
+            return False
+
+        current = self.sums / self.window
+        self.sums = np.zeros_like(self.sums)
+        self.filled = 0
+
+        self.settled = self.settled + 1 if self.windows and self.agree(self.windows[-1], current) else 0
+        self.windows.append(current)
+
+        if (self.settled >= self.patience and tick >= self.min_ticks
+                and self.agree(self.windows[0], current)):
+            self.stop_tick = tick
+            return True
+        return False
@@ -0,0 +1,206 @@
+from prey import Prey, Prey_Genome
+from dataclasses import fields
+import importlib.util
+import functools
+import numpy as np
+import math
+import sys
+
+# Prey.get_update_vals written as one loop over flat arrays, so Numba can compile
+# it to machine code. Without Numba installed the vector engine keeps using its
+# NumPy steer_prey; the loop still runs as plain Python, which is how
+# check_parity tests it here. Numba itself takes about half a second to import,
+# so it is only imported once a compiled kernel is asked for.
+#
+# ex. python3 flocking_kernel.py 300 10
+
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+
+# Row of each gene in the (genes, prey) array the vector engine keeps
+_GENE = {f.name: k for k, f in enumerate(fields(Prey_Genome))}
+VISUAL_RANGE = _GENE['visual_range']
+TURNING_FACTOR = _GENE['turning_factor']
+SCREEN_MARGIN = _GENE['screen_margin']
+BIAS_DIRECTION = _GENE['bias_direction']
+BIAS_VAL = _GENE['bias_val']
+SPEED_PREF = _GENE['speed_pref']
+PROPULSION = _GENE['propulsion']
+AVOID_FACTOR = _GENE['avoid_factor']
+PROTECTED_RANGE = _GENE['protected_range']
+MATCHING_FACTOR = _GENE['matching_factor']
+CENTERING_FACTOR = _GENE['centering_factor']
+PREDATOR_DETECTION_RANGE = _GENE['predator_detection_range']
+PREDATOR_TURN_FACTOR = _GENE['predator_turn_factor']
+
+def steer_prey_kernel(x, y, vx, vy, genes, px, py, x_min, x_max, y_min, y_max, max_speed, rows, cols):
+    """
+    The next (x, y, vx, vy) of each prey in rows, looking for neighbors among the
+    prey in cols. Same rules and the same order of operations as Prey.get_update_vals
+    with a brute force neighbor search when cols is every prey in ascending order.
+    """
+    n = rows.shape[0]
+    new_x = np.empty(n, x.dtype)
+    new_y = np.empty(n, x.dtype)
+    new_vx = np.empty(n, x.dtype)
+    new_vy = np.empty(n, x.dtype)
+
+    for r in range(n):
+        i = rows[r]
+        xi = x[i]
+        yi = y[i]
+        # Compared squared, like the NumPy path, so the inner loop needs no square root
+        visual_sq = genes[VISUAL_RANGE, i] ** 2
+        protected_sq = genes[PROTECTED_RANGE, i] ** 2
+
+        xpos_sum = ypos_sum = xvel_sum = yvel_sum = 0.0
+        close_dx = close_dy = 0.0
+        count = 0
+
+        for j in cols:
+            dx = xi - x[j]
+            dy = yi - y[j]
+            dist_sq = dx * dx + dy * dy
+
+            if dist_sq < visual_sq:
+                if dist_sq > protected_sq: # sweet spot for flocking
+                    xpos_sum += x[j]
+                    ypos_sum += y[j]
+                    xvel_sum += vx[j]
+                    yvel_sum += vy[j]
+                    count += 1
+                else: # too close --> avoid
+                    close_dx += dx
+                    close_dy += dy
+
+        # Avoidance Math
+        nvx = vx[i] + close_dx * genes[AVOID_FACTOR, i]
+        nvy = vy[i] + close_dy * genes[AVOID_FACTOR, i]
+
+        # Predator Avoidance
+        detection = genes[PREDATOR_DETECTION_RANGE, i]
+        for k in range(px.shape[0]):
+            dx = xi - px[k]
+            dy = yi - py[k]
+            dist = math.hypot(dx, dy)
+
+            if 0 < dist and dist < detection:
+                magnitude = genes[PREDATOR_TURN_FACTOR, i] * (1 - dist / detection)
+                nvx = nvx + (dx / dist) * magnitude
+                nvy = nvy + (dy / dist) * magnitude
+
+        # Neighborhood Math
+        if count > 0:
+            nvx = (nvx +
+                   (xpos_sum / count - xi) * genes[CENTERING_FACTOR, i] +
+                   (xvel_sum / count - vx[i]) * genes[MATCHING_FACTOR, i])
+            nvy = (nvy +
+                   (ypos_sum / count - yi) * genes[CENTERING_FACTOR, i] +
+                   (yvel_sum / count - vy[i]) * genes[MATCHING_FACTOR, i])
+
+        # Screen margins
+        margin = genes[SCREEN_MARGIN, i]
+        turning = genes[TURNING_FACTOR, i]
+        if xi < x_min + margin:
+            nvx = nvx + turning
+        elif xi > x_max - margin:
+            nvx = nvx - turning
+
+        if yi < y_min + margin:
+            nvy = nvy + turning
+        elif yi > y_max - margin:
+            nvy = nvy - turning
+
+        # Add bias
+        theta = math.radians(genes[BIAS_DIRECTION, i])
+        bias_val = genes[BIAS_VAL, i]
+        nvx = (1 - bias_val) * nvx + bias_val * math.cos(theta)
+        nvy = (1 - bias_val) * nvy + bias_val * math.sin(theta)
+
+        # Propulsion towards the prefered speed
+        speed = math.hypot(nvx, nvy)
+        if speed > 0:
+            push = genes[PROPULSION, i] * (genes[SPEED_PREF, i] - speed)
+            nvx += push * (nvx / speed)
+            nvy += push * (nvy / speed)
+
+        # Speed limit (checked against the speed before propulsion, like Prey)
+        if speed > max_speed:
+            nvx = (nvx / speed) * max_speed
+            nvy = (nvy / speed) * max_speed
+
+        new_x[r] = xi + nvx
+        new_y[r] = yi + nvy
+        new_vx[r] = nvx
+        new_vy[r] = nvy
+
+    return new_x, new_y, new_vx, new_vy
+
+@functools.cache
+def compiled_steer_prey():
+    """
+    steer_prey_kernel compiled by Numba (needs HAVE_NUMBA)
+    """
+    from numba import njit
+
+    # nogil so tiles of one world can be steered on several threads at once
+    return njit(cache=True, nogil=True)(steer_prey_kernel)
+
+def use_compiled_kernel(prey_kernel: str) -> bool:
+    """
+    Resolves the prey_kernel option: 'auto' compiles with Numba when it is installed
+    and quietly falls back to NumPy otherwise, 'numba' insists on it, 'numpy' never uses it
+    """
+    match prey_kernel:
+        case 'auto':
+            return HAVE_NUMBA
+        case 'numba':
+            if not HAVE_NUMBA:
+                raise ImportError("prey_kernel = numba needs the numba package installed")
+            return True
+        case 'numpy':
+            return False
+        case _:
+            raise ValueError(f"Unknown prey_kernel: {prey_kernel}")
+
+def check_parity(prey: int = 200, predators: int = 10, seed: int = 0, config_path: str = 'config.ini') -> dict[str, float]:
+    """
+    Largest difference between the kernel's next state and both Prey.get_update_vals
+    and the vector engine's NumPy steer_prey, from the same starting populations.
+    Uses the compiled kernel when Numba is installed, the plain Python loop otherwise.
+    """
+    from world import simulation_from_config # Deferred, world imports the vector engine on demand which imports this module
+    from sweep import load_config, apply_overrides
+
+    overrides = {'World_Values.prey_pop_size': str(prey), 'World_Values.predator_pop_size': str(predators),
+                 'World_Values.neighbor_search': 'brute'}
+    sim = simulation_from_config(apply_overrides(load_config(config_path), overrides), 'object', seed)
+
+    for p in sim.prey_population:
+        p.get_update_vals(sim.world)
+    state = sim.prey_state
+    expected = np.array([state.next_x, state.next_y, state.next_vx, state.next_vy])
+
+    from vector_world import Vector_Simulation
+    vector = Vector_Simulation.from_simulation(sim, 'numpy')
+    numpy_result = np.array(vector.steer_prey())
+
+    kernel = compiled_steer_prey() if HAVE_NUMBA else steer_prey_kernel
+    (x_min, x_max), (y_min, y_max) = Prey._world_bounds
+    everyone = np.arange(len(vector.x))
+    kernel_result = np.array(kernel(vector.x, vector.y, vector.vx, vector.vy, vector.genes, vector.px, vector.py,
+                                    x_min, x_max, y_min, y_max, float(Prey._max_speed), everyone, everyone))
+
+    return {
+        'compiled': HAVE_NUMBA,
+        'vs_object': float(np.max(np.abs(kernel_result - expected), initial=0.0)),
+        'vs_numpy': float(np.max(np.abs(kernel_result - numpy_result), initial=0.0)),
+    }
+
+if __name__ == "__main__":
+    prey = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    predators = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    result = check_parity(prey, predators)
+    print(f"{'numba' if result['compiled'] else 'python'} kernel, max difference "
+          f"{result['vs_object']:.3e} vs Prey.get_update_vals, {result['vs_numpy']:.3e} vs NumPy steer_prey")
+    sys.exit(0 if max(result['vs_object'], result['vs_numpy']) < 1e-9 else 1)
@@ -0,0 +1,104 @@
+import numpy as np
+
+class Gene_Stats:
+    """
+    Running mean, variance, min and max of every gene across a population.
+
+    Instead of rescanning every genome each tick, the engines call remove() for
+    each killed boid and add() for each child, so keeping the statistics current
+    costs O(kills * genes) per tick. source returns the population's current
+    (boids, genes) values and is only called when a removed boid held a gene's
+    min or max, which happens about once per population size worth of kills.
+    """
+
+    def __init__(self, gene_names: list[str], values, source=None):
+        self.gene_names = list(gene_names)
+        self.source = source
+        self.rebuild(values)
+
+    def rebuild(self, values):
+        """
+        Recomputes everything from scratch, values holds one row of genes per boid
+        """
+        data = np.asarray(values, dtype=np.float64).reshape(-1, len(self.gene_names))
+        self.count = len(data)
+
+        # Sums are kept relative to a fixed shift (the starting mean) so the variance
+        # doesn't lose precision when the spread is small next to the values themselves
+        self.shift = data.mean(axis=0) if self.count else np.zeros(len(self.gene_names))
+        offsets = data - self.shift
+        self.sum = offsets.sum(axis=0)
+        self.sum_sq = (offsets * offsets).sum(axis=0)
+
+        self.min = data.min(axis=0) if self.count else np.full(len(self.gene_names), np.nan)
+        self.max = data.max(axis=0) if self.count else np.full(len(self.gene_names), np.nan)
+        self.extremes_stale = False
+
+    def restore_sums(self, shift, sums, sums_sq):
+        """
+        Puts back running sums saved from another Gene_Stats over the same values,
+        so a resumed run rounds exactly like the original
+        """
+        self.shift = np.array(shift, dtype=np.float64)
+        self.sum = np.array(sums, dtype=np.float64)
+        self.sum_sq = np.array(sums_sq, dtype=np.float64)
+
+    def add(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        offset = row - self.shift
+
+        self.count += 1
+        self.sum += offset
+        self.sum_sq += offset * offset
+
+        self.min = np.fmin(self.min, row)
+        self.max = np.fmax(self.max, row)
+
+    def remove(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        offset = row - self.shift
+
+        self.count -= 1
+        self.sum -= offset
+        self.sum_sq -= offset * offset
+
+        # Losing the boid that held an extreme means rescanning, put off until someone asks
+        if np.any(row <= self.min) or np.any(row >= self.max):
+            self.extremes_stale = True
+
+    def refresh_extremes(self):
+        if self.extremes_stale and self.source is not None:
+            data = np.asarray(self.source(), dtype=np.float64).reshape(-1, len(self.gene_names))
+            self.min = data.min(axis=0) if len(data) else np.full(len(self.gene_names), np.nan)
+            self.max = data.max(axis=0) if len(data) else np.full(len(self.gene_names), np.nan)
+            self.extremes_stale = False
+
+    def mean(self) -> dict[str, float]:
+        if self.count == 0:
+            return {name: float('nan') for name in self.gene_names}
+        means = self.shift + self.sum / self.count
+        return dict(zip(self.gene_names, means.tolist()))
+
+    def variance(self) -> dict[str, float]:
+        if self.count == 0:
+            return {name: float('nan') for name in self.gene_names}
+        variances = np.maximum(self.sum_sq / self.count - (self.sum / self.count) ** 2, 0.0)
+        return dict(zip(self.gene_names, variances.tolist()))
+
+    def minimum(self) -> dict[str, float]:
+        self.refresh_extremes()
+        return dict(zip(self.gene_names, self.min.tolist()))
+
+    def maximum(self) -> dict[str, float]:
+        self.refresh_extremes()
+        return dict(zip(self.gene_names, self.max.tolist()))
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        {gene: {'mean', 'variance', 'min', 'max'}}
+        """
+        mean, variance, minimum, maximum = self.mean(), self.variance(), self.minimum(), self.maximum()
+        return {
+            name: {'mean': mean[name], 'variance': variance[name], 'min': minimum[name], 'max': maximum[name]}
+            for name in self.gene_names
+        }
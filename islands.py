@@ -0,0 +1,152 @@
+from world import simulation_from_config
+from sweep import load_config, parse_override, apply_overrides, write_table
+from prey import Prey_Genome
+from multiprocessing import Process, Pipe
+from dataclasses import fields
+import numpy as np
+import argparse
+import time
+import os
+
+# Island model: several simulations evolve side by side, one per process, each with
+# its own seed, predators and config overrides. Every migrate_every ticks each island
+# sends copies of its fittest prey genomes to another island (the next one round a
+# ring, or a random one), where they replace the least fit prey. Only the migrants
+# cross between processes during the run, as one (migrants, genes) float64 array.
+#
+# ex. python3 islands.py 20000 --islands 4 --every 500 --migrants 5 --topology ring --set World_Values.predator_pop_size=5,10
+
+def island_worker(conn, config, seed, migrants):
+    """
+    Runs one island. Takes ('run', ticks, immigrants) and answers with the island's
+    emigrants, takes ('stop',) and answers with its whole gene average history
+    """
+    sim = simulation_from_config(config, seed=seed)
+    history = []
+
+    while True:
+        message = conn.recv()
+        if message[0] == 'stop':
+            conn.send(np.array(history, dtype=np.float64).reshape(len(history), len(sim.gene_names)))
+            conn.close()
+            return
+
+        _, ticks, immigrants = message
+        if len(immigrants):
+            # Newcomers take over the least fit slots
+            worst = np.argsort(sim.prey_fitness(), kind='stable')[:len(immigrants)]
+            sim.implant_genomes(worst, immigrants[:len(worst)])
+
+        for _ in range(ticks):
+            sim.tick()
+            history.append(list(sim.prey_gene_averages().values()))
+
+        best = np.argsort(-sim.prey_fitness(), kind='stable')[:migrants]
+        conn.send(np.ascontiguousarray(sim.prey_genomes(best)))
+
+def migration_targets(islands: int, topology: str, rng: np.random.Generator) -> list[int]:
+    """
+    Island each island sends its emigrants to this round
+    """
+    match topology:
+        case 'ring':
+            return [(i + 1) % islands for i in range(islands)]
+        case 'random':
+            # Anyone but yourself
+            return [int((i + rng.integers(1, islands)) % islands) for i in range(islands)]
+        case _:
+            raise ValueError(f"Unknown topology: {topology}")
+
+def island_configs(config, grid: dict[str, list[str]], islands: int) -> list[tuple[dict, dict]]:
+    """
+    (config, overrides) per island, island i takes value i (wrapping round) of each --set list
+    """
+    configs = []
+    for i in range(islands):
+        overrides = {name: values[i % len(values)] for name, values in grid.items()}
+        configs.append((apply_overrides(config, overrides), overrides))
+    return configs
+
+def run_islands(config, grid, islands: int, ticks: int, migrate_every: int, migrants: int,
+                topology: str = 'ring', seed: int = 0) -> list[dict]:
+    """
+    Runs the islands for ticks ticks, migrating every migrate_every ticks. Island i
+    is seeded with seed + i and migration is drawn from seed, so the whole run is
+    reproducible. Results are shaped like sweep.run_sweep's, one per island.
+    """
+    rng = np.random.default_rng(seed)
+    configs = island_configs(config, grid, islands)
+
+    connections = []
+    processes = []
+    for i, (island_config, _) in enumerate(configs):
+        parent_conn, child_conn = Pipe()
+        process = Process(target=island_worker, args=(child_conn, island_config, seed + i, migrants), daemon=True)
+        process.start()
+        child_conn.close()
+        connections.append(parent_conn)
+        processes.append(process)
+
+    gene_names = [f.name for f in fields(Prey_Genome)]
+    genes = len(gene_names)
+    arrivals = [np.empty((0, genes)) for _ in range(islands)]
+    migrated = 0
+
+    start_time = time.perf_counter()
+    done = 0
+    while done < ticks:
+        epoch = min(migrate_every, ticks - done) if migrate_every > 0 else ticks - done
+
+        for conn, immigrants in zip(connections, arrivals):
+            conn.send(('run', epoch, immigrants))
+        emigrants = [conn.recv() for conn in connections]
+        done += epoch
+
+        targets = migration_targets(islands, topology, rng) if islands > 1 and done < ticks else []
+        incoming = [[] for _ in range(islands)]
+        for source, target in enumerate(targets):
+            incoming[target].append(emigrants[source])
+            migrated += len(emigrants[source])
+        arrivals = [np.concatenate(parts) if parts else np.empty((0, genes)) for parts in incoming]
+
+    for conn in connections:
+        conn.send(('stop',))
+    histories = [conn.recv() for conn in connections]
+    for process in processes:
+        process.join()
+    runtime = time.perf_counter() - start_time
+
+    print(f"{migrated} genomes migrated between {islands} islands")
+    return [
+        {
+            'run': i,
+            'seed': seed + i,
+            'overrides': overrides,
+            'runtime': runtime,
+            'history': {name: history[:, k].tolist() for k, name in enumerate(gene_names)},
+        }
+        for i, ((_, overrides), history) in enumerate(zip(configs, histories))
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evolve several populations in parallel with migration between them")
+    parser.add_argument('ticks', type=int, help="world ticks per island")
+    parser.add_argument('--islands', type=int, default=os.cpu_count())
+    parser.add_argument('--every', type=int, default=500, help="ticks between migrations (0 for none)")
+    parser.add_argument('--migrants', type=int, default=5, help="fittest genomes each island sends per migration")
+    parser.add_argument('--topology', choices=['ring', 'random'], default='ring')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        help="Section.key=v1,v2 island i gets value i, can be repeated")
+    parser.add_argument('--config', default='config.ini')
+    parser.add_argument('--out', default='island_results.csv')
+    args = parser.parse_args()
+
+    grid = dict(parse_override(text) for text in args.overrides)
+
+    results = run_islands(load_config(args.config), grid, args.islands, args.ticks, args.every,
+                          args.migrants, args.topology, args.seed)
+
+    write_table(results, args.out)
+    print(f"{len(results)} islands, {args.ticks} ticks each in {results[0]['runtime']:0.4f} seconds -> {args.out}")
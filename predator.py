@@ -4,26 +4,21 @@ from typing import ClassVar, TypedDict, Tuple
 import random
 import math
 
-@dataclass
+@dataclass(slots=True)
 class Predator_Genome(Genome):
     speed_limit: float
     speed_pref: float
     catch_radius: float
 
 class Predator(Boid):
+    __slots__ = ('kills',)
+
     _max_speed: ClassVar[float] = 15
     _world_bounds: ClassVar[Tuple[Tuple[float, float], Tuple[float, float]]] = ((-150, 150), (-150, 150))
 
-    def init(self, x, y, vx, vy, genome: Predator_Genome):
-        self.x: float = x
-        self.y: float = y
-        self.vx: float = vx
-        self.vy: float = vy
-        self.age: int = 0
+    def __init__(self, x, y, vx, vy, genome: Predator_Genome):
+        super().__init__(x, y, vx, vy, genome)
         self.kills: int = 0
-        self.genome: Predator_Genome = genome
-
-        self.update_dict: dict = {}
 
     def get_update_vals(self, world):
 
@@ -31,21 +26,31 @@ class Predator(Boid):
         
         self.age += 1
 
-        prey = world['prey_population']
+        prey_state = world['prey_state']
+        x = self.state.x[self.index]
+        y = self.state.y[self.index]
             
         min_dist = float("inf")
         min_x = 0.0
         min_y = 0.0
 
-        for p in prey:
-            distance = math.dist([self.x, self.y], [p.x, p.y])
-            if distance < min_dist:
+        grid = world.get('prey_grid')
+        if grid is not None: # Search outwards from my cell instead of checking every prey
+            nearest, distance = grid.nearest(x, y, prey_state.x, prey_state.y)
+            if nearest >= 0:
                 min_dist = distance
-                min_x = p.x
-                min_y = p.y
+                min_x = prey_state.x[nearest]
+                min_y = prey_state.y[nearest]
+        else:
+            for p_x, p_y in zip(prey_state.x, prey_state.y):
+                distance = math.dist([x, y], [p_x, p_y])
+                if distance < min_dist:
+                    min_dist = distance
+                    min_x = p_x
+                    min_y = p_y
 
-        dx = min_x - self.x
-        dy = min_y - self.y
+        dx = min_x - x
+        dy = min_y - y
         if min_dist > 0: # Calculate unit vectors
             ux = dx / min_dist
             uy = dy / min_dist
@@ -54,17 +59,10 @@ class Predator(Boid):
             
         new_vx = ux * self.genome.speed_pref
         new_vy = uy * self.genome.speed_pref
-        new_x = self.x + new_vx
-        new_y = self.y + new_vy
-
-
+        new_x = x + new_vx
+        new_y = y + new_vy
 
-        self.update_dict = {
-                'new_x': new_x,
-                'new_y': new_y,
-                'new_vx': new_vx,
-                'new_vy': new_vy
-                }
+        self.set_next(new_x, new_y, new_vx, new_vy)
 
     def count_kill(self):
         self.kills += 1
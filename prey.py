@@ -7,7 +7,7 @@ import math
 # prey boid algorithm based on the explanation and psuedocode found here!
 # https://vanhunteradams.com/Pico/Animal_Movement/Boids-predator.html
 
-@dataclass
+@dataclass(slots=True)
 class Prey_Genome(Genome):
     visual_range: float # How far can I see
     turning_factor: float # How fast to turn from screen edges
@@ -26,16 +26,10 @@ class Prey_Genome(Genome):
 
 
 class Prey(Boid):
+    __slots__ = ()
+
     def __init__(self, x, y, vx, vy, genome: Prey_Genome):
-        # General
-        self.x: float = x
-        self.y: float = y
-        self.vx: float = vx
-        self.vy: float = vy # might add a starting vel mag to genome
-        self.age: int = 0
-        self.genome: Prey_Genome = genome
-
-        self.update_dict = {}
+        super().__init__(x, y, vx, vy, genome) # might add a starting vel mag to genome
         
     def get_update_vals(self, world: dict):
         #TODO: This should eventually be changed to avoid order dependance (weighted sum?)
@@ -45,37 +39,56 @@ class Prey(Boid):
         
         self.age += 1
 
+        # Everyone's current state, read straight from the population's buffers
+        prey_state = world['prey_state']
+        xs, ys, vxs, vys = prey_state.x, prey_state.y, prey_state.vx, prey_state.vy
+
+        x = self.state.x[self.index]
+        y = self.state.y[self.index]
+        vx = self.state.vx[self.index]
+        vy = self.state.vy[self.index]
+
         new_x = 0
         new_y = 0
-        new_vx = self.vx
-        new_vy = self.vy
+        new_vx = vx
+        new_vy = vy
 
-        preys = world['prey_population']
+        grid = world.get('prey_grid')
+        if grid is not None: # Only look at boids in the cells around me
+            neighbors = grid.query(x, y, self.genome.visual_range)
+        else:
+            neighbors = range(len(xs))
 
-        for boid in preys:
-            distance = math.dist([self.x, self.y], [boid.x, boid.y])
+        if world.get('profiler') is not None:
+            world['profiler'].count('neighbors_examined', len(neighbors))
+
+        for j in neighbors:
+            boid_x = xs[j]
+            boid_y = ys[j]
+            distance = math.dist([x, y], [boid_x, boid_y])
 
             if (distance < self.genome.visual_range):
                 if (distance > self.genome.protected_range): # sweet spot for flocking
-                    boid_xpos_avg += boid.x
-                    boid_ypos_avg += boid.y
-                    boid_xvel_ave += boid.vx
-                    boid_yvel_ave += boid.vy
+                    boid_xpos_avg += boid_x
+                    boid_ypos_avg += boid_y
+                    boid_xvel_ave += vxs[j]
+                    boid_yvel_ave += vys[j]
 
                     boid_neighbor_count+=1
                 
                 else: # too close --> avoid
-                    close_dx += self.x - boid.x
-                    close_dy += self.y - boid.y
+                    close_dx += x - boid_x
+                    close_dy += y - boid_y
         
         # Avoidance Math
         new_vx = new_vx + (close_dx*self.genome.avoid_factor)
         new_vy = new_vy + (close_dy*self.genome.avoid_factor)
 
         # Predator Avoidance
-        for pred in world['predator_population']:
-            dx = self.x - pred.x
-            dy = self.y - pred.y
+        pred_state = world['predator_state']
+        for pred_x, pred_y in zip(pred_state.x, pred_state.y):
+            dx = x - pred_x
+            dy = y - pred_y
             dist = math.hypot(dx, dy)
 
             if (0 < dist and dist < self.genome.predator_detection_range):
@@ -91,12 +104,12 @@ class Prey(Boid):
             boid_yvel_ave = boid_yvel_ave / boid_neighbor_count
 
             new_vx = (new_vx + 
-                       (boid_xpos_avg - self.x)*self.genome.centering_factor + 
-                       (boid_xvel_ave - self.vx)*self.genome.matching_factor)
+                       (boid_xpos_avg - x)*self.genome.centering_factor + 
+                       (boid_xvel_ave - vx)*self.genome.matching_factor)
             
             new_vy = (new_vy + 
-                      (boid_ypos_avg - self.y)*self.genome.centering_factor + 
-                      (boid_yvel_ave - self.vy)*self.genome.matching_factor) 
+                      (boid_ypos_avg - y)*self.genome.centering_factor + 
+                      (boid_yvel_ave - vy)*self.genome.matching_factor) 
         
         # Check that I am still in the screen_margin
         left_margin_check = self._world_bounds[0][0] + self.genome.screen_margin # -150 + 20 = -130
@@ -104,14 +117,14 @@ class Prey(Boid):
         bottom_margin_check = self._world_bounds[1][0] + self.genome.screen_margin
         top_margin_check = self._world_bounds[1][1] - self.genome.screen_margin
 
-        if self.x < left_margin_check: # too far left
+        if x < left_margin_check: # too far left
             new_vx = new_vx + self.genome.turning_factor
-        elif self.x > right_margin_check: # too far right
+        elif x > right_margin_check: # too far right
             new_vx = new_vx - self.genome.turning_factor
 
-        if self.y < bottom_margin_check:
+        if y < bottom_margin_check:
             new_vy = new_vy + self.genome.turning_factor
-        elif self.y > top_margin_check:
+        elif y > top_margin_check:
             new_vy = new_vy - self.genome.turning_factor        
 
         # Add bias
@@ -136,21 +149,10 @@ class Prey(Boid):
             new_vx = (new_vx/speed)*self._max_speed
             new_vy = (new_vy/speed)*self._max_speed
         
-        new_x = self.x + new_vx
-        new_y = self.y + new_vy
+        new_x = x + new_vx
+        new_y = y + new_vy
 
-        self.update_dict = {
-                'new_x': new_x,
-                'new_y': new_y,
-                'new_vx': new_vx,
-                'new_vy': new_vy
-                }
+        self.set_next(new_x, new_y, new_vx, new_vy)
 
     def get_fitness(self):
         return self.age
-
-    def update_vals(self):
-        self.x = self.update_dict['new_x']
-        self.y = self.update_dict['new_y']
-        self.vx = self.update_dict['new_vx']
-        self.vy = self.update_dict['new_vy'] 
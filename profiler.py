@@ -0,0 +1,83 @@
+from collections import defaultdict, Counter
+import json
+import time
+
+class Tick_Profiler:
+    """
+    Wall time per phase of Simulation.tick plus work counters, accumulated over a run.
+
+    Attach with sim.enable_profiling(). The engines only touch the profiler behind
+    an 'is not None' check, so leaving it off costs next to nothing.
+    """
+
+    def __init__(self):
+        self.phase_seconds: defaultdict = defaultdict(float)
+        self.counters: defaultdict = defaultdict(int)
+        self.kill_histogram: Counter = Counter() # kills in a tick -> number of ticks
+        self.ticks: int = 0
+
+        self.last: float = 0.0
+        self.tick_kills: int = 0
+
+    def start_tick(self):
+        self.tick_kills = 0
+        self.last = time.perf_counter()
+
+    def lap(self, phase: str):
+        """
+        Charges the time since the last lap (or the start of the tick) to phase
+        """
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self.last
+        self.last = now
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def record_kills(self, kills: int):
+        self.tick_kills += kills
+        self.counters['kills'] += kills
+
+    def end_tick(self):
+        self.ticks += 1
+        self.kill_histogram[self.tick_kills] += 1
+
+    def summary(self) -> dict:
+        ticks = max(self.ticks, 1)
+        total = sum(self.phase_seconds.values())
+
+        return {
+            'ticks': self.ticks,
+            'total_seconds': total,
+            'phases': {
+                phase: {
+                    'seconds': seconds,
+                    'ms_per_tick': seconds / ticks * 1e3,
+                    'share': seconds / total if total else 0.0,
+                }
+                for phase, seconds in self.phase_seconds.items()
+            },
+            'counters': {
+                name: {'total': value, 'per_tick': value / ticks}
+                for name, value in self.counters.items()
+            },
+            'kills_per_tick': {str(kills): n for kills, n in sorted(self.kill_histogram.items())},
+        }
+
+    def table(self) -> str:
+        summary = self.summary()
+        lines = [f"{summary['ticks']} ticks, {summary['total_seconds']:0.4f} seconds",
+                 f"{'phase':<20}{'seconds':>12}{'ms/tick':>12}{'share':>9}"]
+
+        for phase, row in sorted(summary['phases'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"{phase:<20}{row['seconds']:>12.4f}{row['ms_per_tick']:>12.4f}{row['share']:>8.1%}")
+
+        lines.append(f"{'counter':<20}{'total':>12}{'per tick':>12}")
+        for name, row in sorted(summary['counters'].items()):
+            lines.append(f"{name:<20}{row['total']:>12}{row['per_tick']:>12.2f}")
+
+        return '\n'.join(lines)
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,366 @@
+from collections import defaultdict
+import numpy as np
+import glob
+import json
+import os
+
+# Writers that stream simulation output to disk as the run goes so that long
+# runs don't have to keep their whole history in memory.
+
+class History_Writer:
+    """
+    Buffers one row of gene averages per tick and writes them out every chunk_size ticks.
+
+    fmt 'npz' writes history_00000.npz, history_00001.npz, ... with a 'tick' array and
+    one array per gene. fmt 'csv' appends the chunks to a single history.csv.
+    """
+
+    def __init__(self, out_dir: str, gene_names: list[str], chunk_size: int = 10000, fmt: str = 'npz'):
+        if fmt not in ('npz', 'csv'):
+            raise ValueError(f"Unknown history format: {fmt}")
+
+        self.out_dir = out_dir
+        self.gene_names = list(gene_names)
+        self.chunk_size = chunk_size
+        self.fmt = fmt
+
+        self.buffer = np.empty((chunk_size, len(self.gene_names)))
+        self.rows = 0 # Rows waiting in the buffer
+        self.tick = 0 # Tick of the next row
+        self.chunks = 0
+
+        os.makedirs(out_dir, exist_ok=True)
+
+        if fmt == 'csv':
+            with open(self.csv_path, 'w') as f:
+                f.write(','.join(['tick', *self.gene_names]) + '\n')
+
+    @property
+    def csv_path(self) -> str:
+        return os.path.join(self.out_dir, 'history.csv')
+
+    def append(self, averages: dict[str, float]):
+        row = self.buffer[self.rows]
+        for k, param in enumerate(self.gene_names):
+            row[k] = averages[param]
+
+        self.rows += 1
+        if self.rows == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows == 0:
+            return
+
+        ticks = np.arange(self.tick, self.tick + self.rows)
+        chunk = self.buffer[:self.rows]
+
+        if self.fmt == 'npz':
+            path = os.path.join(self.out_dir, f'history_{self.chunks:05d}.npz')
+            np.savez(path, tick=ticks, **{param: chunk[:, k] for k, param in enumerate(self.gene_names)})
+        else:
+            with open(self.csv_path, 'a') as f:
+                np.savetxt(f, np.column_stack((ticks, chunk)), delimiter=',',
+                           fmt=['%d'] + ['%.17g'] * len(self.gene_names))
+
+        self.tick += self.rows
+        self.rows = 0
+        self.chunks += 1
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_history(out_dir: str) -> dict[str, np.ndarray]:
+    """
+    Loads everything a History_Writer wrote to out_dir back into {gene: values}
+    """
+    csv_path = os.path.join(out_dir, 'history.csv')
+    if os.path.exists(csv_path):
+        with open(csv_path) as f:
+            names = f.readline().strip().split(',')
+        data = np.loadtxt(csv_path, delimiter=',', skiprows=1, ndmin=2)
+        return {name: data[:, k] for k, name in enumerate(names) if name != 'tick'}
+
+    chunks = defaultdict(list)
+    for path in sorted(glob.glob(os.path.join(out_dir, 'history_*.npz'))):
+        with np.load(path) as data:
+            for name in data.files:
+                if name != 'tick':
+                    chunks[name].append(data[name])
+
+    return {name: np.concatenate(parts) for name, parts in chunks.items()}
+
+class Trajectory_Writer:
+    """
+    Records every boid's (x, y, vx, vy) after every tick as flat float32 binary files
+    that Trajectory opens as memmaps.
+
+    Prey keep their slot for life and a caught prey's slot goes straight to its
+    replacement, so each tick is one fixed size (slots, 4) block:
+        prey.f32, predators.f32   the state blocks, one per recorded tick
+        births.i8                 (tick, slot, genome row) for every prey born, starting population at the first tick
+        deaths.i8                 (tick, slot) for every prey caught
+        genomes.f8                one row of genes per birth
+        meta.json                 slot counts, gene names, world bounds and the first tick
+    """
+
+    def __init__(self, out_dir: str, sim):
+        self.out_dir = out_dir
+        self.sim = sim
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.genome_rows = 0
+        with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'first_tick': sim.tick_count,
+                'prey_slots': sim.prey_count(),
+                'predator_slots': len(sim.predator_positions()),
+                'gene_names': list(sim.gene_names),
+                'bounds': [float(sim.config['World_Values'][k]) for k in ('xmin', 'xmax', 'ymin', 'ymax')],
+            }, f, indent=2)
+
+        self.files = {name: open(os.path.join(out_dir, name), 'wb')
+                      for name in ('prey.f32', 'predators.f32', 'births.i8', 'deaths.i8', 'genomes.f8')}
+
+        self.write_states()
+        self.write_births(range(sim.prey_count()))
+
+    def write_states(self):
+        self.files['prey.f32'].write(self.sim.prey_states().astype('<f4').tobytes())
+        self.files['predators.f32'].write(self.sim.predator_states().astype('<f4').tobytes())
+
+    def write_births(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+
+        rows = np.arange(self.genome_rows, self.genome_rows + len(slots))
+        births = np.column_stack((np.full(len(slots), self.sim.tick_count), slots, rows))
+        self.files['births.i8'].write(births.astype('<i8').tobytes())
+        self.files['genomes.f8'].write(np.asarray(self.sim.prey_genomes(slots), dtype='<f8').tobytes())
+        self.genome_rows += len(slots)
+
+    def record(self):
+        """
+        Call once after every tick
+        """
+        self.write_states()
+
+        if self.sim.replaced:
+            slots = np.asarray(self.sim.replaced, dtype=np.int64)
+            deaths = np.column_stack((np.full(len(slots), self.sim.tick_count), slots))
+            self.files['deaths.i8'].write(deaths.astype('<i8').tobytes())
+            self.write_births(slots)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Trajectory:
+    """
+    Read side of Trajectory_Writer. Everything is a memmap, so slicing out a range
+    of ticks reads only those ticks from disk and copies nothing.
+    """
+
+    def __init__(self, out_dir: str):
+        with open(os.path.join(out_dir, 'meta.json')) as f:
+            meta = json.load(f)
+
+        self.first_tick: int = meta['first_tick']
+        self.gene_names: list[str] = meta['gene_names']
+        self.bounds: list[float] = meta['bounds']
+
+        self.prey = _open_memmap(os.path.join(out_dir, 'prey.f32'), '<f4', (meta['prey_slots'], 4))
+        self.predators = _open_memmap(os.path.join(out_dir, 'predators.f32'), '<f4', (meta['predator_slots'], 4))
+        self.births = _open_memmap(os.path.join(out_dir, 'births.i8'), '<i8', (3,))
+        self.deaths = _open_memmap(os.path.join(out_dir, 'deaths.i8'), '<i8', (2,))
+        self.genomes = _open_memmap(os.path.join(out_dir, 'genomes.f8'), '<f8', (len(self.gene_names),))
+
+        # Both recorded ticks are complete, a run cut short can leave a partial block behind
+        self.ticks = min(len(self.prey), len(self.predators))
+
+    def __len__(self) -> int:
+        return self.ticks
+
+    def frame(self, tick: int) -> int:
+        frame = tick - self.first_tick
+        if not 0 <= frame < self.ticks:
+            raise IndexError(f"Tick {tick} not recorded (ticks {self.first_tick} to {self.first_tick + self.ticks - 1})")
+        return frame
+
+    def prey_states(self, start: int, stop: int | None = None) -> np.ndarray:
+        """
+        (ticks, slots, 4) view of prey (x, y, vx, vy) from tick start up to stop
+        """
+        stop = start + 1 if stop is None else stop
+        return self.prey[self.frame(start):self.frame(stop - 1) + 1]
+
+    def predator_states(self, start: int, stop: int | None = None) -> np.ndarray:
+        stop = start + 1 if stop is None else stop
+        return self.predators[self.frame(start):self.frame(stop - 1) + 1]
+
+    def genomes_at(self, tick: int) -> np.ndarray:
+        """
+        (slots, genes) genomes of the prey alive at tick, the latest birth in each slot
+        """
+        self.frame(tick)
+        born = self.births[:np.searchsorted(self.births[:, 0], tick, side='right')]
+
+        rows = np.empty(self.prey.shape[1], dtype=np.int64)
+        rows[born[:, 1]] = born[:, 2] # Later births overwrite earlier ones in the same slot
+        return self.genomes[rows]
+
+    def deaths_between(self, start: int, stop: int) -> np.ndarray:
+        """
+        (tick, slot) rows for every prey caught from tick start up to stop
+        """
+        ticks = self.deaths[:, 0]
+        return self.deaths[np.searchsorted(ticks, start, side='left'):np.searchsorted(ticks, stop, side='left')]
+
+# Event types in an Event_Log
+BIRTH = 0
+DEATH = 1
+
+EVENT_DTYPE = np.dtype([
+    ('tick', '<i8'),
+    ('type', 'u1'),
+    ('predator', '<i4'),  # Catching predator's slot for deaths, -1 for births
+    ('prey', '<i8'),      # Id of the prey born or caught
+    ('parent1', '<i8'),   # Parents' ids for births, -1 for deaths and the starting population
+    ('parent2', '<i8'),
+    ('genome', '<i8'),    # Row in genomes.f8 for births, -1 for deaths
+])
+
+class Event_Log:
+    """
+    Append-only log of every prey birth and death, one EVENT_DTYPE record each.
+    Records go into a typed buffer (doubled whenever a tick outgrows it) and are
+    appended to disk every chunk_size events, so a long run's lineage never sits in memory.
+        events.bin    the records, back to back
+        genomes.f8    one row of genes per birth
+        meta.json     gene names and the first tick
+    """
+
+    def __init__(self, out_dir: str, sim, chunk_size: int = 65536):
+        self.out_dir = out_dir
+        self.sim = sim
+        self.chunk_size = chunk_size
+        os.makedirs(out_dir, exist_ok=True)
+
+        with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+            json.dump({'first_tick': sim.tick_count, 'gene_names': list(sim.gene_names)}, f, indent=2)
+
+        self.events = np.empty(chunk_size, dtype=EVENT_DTYPE)
+        self.genomes = np.empty((chunk_size, len(sim.gene_names)), dtype='<f8')
+        self.rows = 0 # Events waiting in the buffer
+        self.genome_rows = 0 # Births waiting in the buffer
+        self.genomes_written = 0
+
+        self.files = {name: open(os.path.join(out_dir, name), 'wb') for name in ('events.bin', 'genomes.f8')}
+
+        # The starting population is born at the first tick with no parents
+        slots = np.arange(sim.prey_count())
+        none = np.full(len(slots), -1)
+        self.add_births(np.asarray(sim.prey_ids, dtype=np.int64)[slots], none, none, sim.prey_genomes(slots))
+
+    def reserve(self, events: int, births: int):
+        """
+        Grows the buffers to hold that many more events and births
+        """
+        if self.rows + events > len(self.events):
+            grown = np.empty(max(2 * len(self.events), self.rows + events), dtype=EVENT_DTYPE)
+            grown[:self.rows] = self.events[:self.rows]
+            self.events = grown
+        if self.genome_rows + births > len(self.genomes):
+            grown = np.empty((max(2 * len(self.genomes), self.genome_rows + births), self.genomes.shape[1]), dtype='<f8')
+            grown[:self.genome_rows] = self.genomes[:self.genome_rows]
+            self.genomes = grown
+
+    def add(self, kind: int, predators, prey, parent1, parent2, genome_rows):
+        k = len(prey)
+        events = self.events[self.rows:self.rows + k]
+        events['tick'] = self.sim.tick_count
+        events['type'] = kind
+        events['predator'] = predators
+        events['prey'] = prey
+        events['parent1'] = parent1
+        events['parent2'] = parent2
+        events['genome'] = genome_rows
+        self.rows += k
+
+    def add_births(self, ids, parent1, parent2, genomes):
+        k = len(ids)
+        self.reserve(k, k)
+        first = self.genomes_written + self.genome_rows
+        self.genomes[self.genome_rows:self.genome_rows + k] = genomes
+        self.genome_rows += k
+        self.add(BIRTH, -1, ids, parent1, parent2, np.arange(first, first + k))
+
+    def add_deaths(self, predators, ids):
+        self.reserve(len(ids), 0)
+        self.add(DEATH, predators, ids, -1, -1, -1)
+
+    def record(self):
+        """
+        Call once after every tick
+        """
+        sim = self.sim
+        if not sim.replaced:
+            return
+
+        slots = np.asarray(sim.replaced, dtype=np.int64)
+        self.add_deaths(np.asarray(sim.killers, dtype=np.int32), np.asarray(sim.dead_ids, dtype=np.int64))
+        self.add_births(np.asarray(sim.prey_ids, dtype=np.int64)[slots], sim.parent_ids[:, 0], sim.parent_ids[:, 1],
+                        sim.prey_genomes(slots))
+
+        if self.rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        self.files['events.bin'].write(self.events[:self.rows].tobytes())
+        self.files['genomes.f8'].write(self.genomes[:self.genome_rows].tobytes())
+        self.genomes_written += self.genome_rows
+        self.rows = 0
+        self.genome_rows = 0
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_events(out_dir: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Memmaps of everything an Event_Log wrote to out_dir: (events, genomes), with
+    events a structured EVENT_DTYPE array and genomes[event['genome']] each birth's genes
+    """
+    with open(os.path.join(out_dir, 'meta.json')) as f:
+        meta = json.load(f)
+
+    events = _open_memmap(os.path.join(out_dir, 'events.bin'), EVENT_DTYPE, ())
+    genomes = _open_memmap(os.path.join(out_dir, 'genomes.f8'), '<f8', (len(meta['gene_names']),))
+    return events, genomes
+
+def _open_memmap(path: str, dtype: str, row_shape: tuple) -> np.ndarray:
+    row_items = int(np.prod(row_shape))
+    rows = os.path.getsize(path) // (np.dtype(dtype).itemsize * row_items)
+    if rows == 0 or row_items == 0:
+        return np.zeros((0, *row_shape), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(rows, *row_shape))
@@ -0,0 +1,166 @@
+from collections import defaultdict
+import numpy as np
+import math
+
+class Uniform_Grid:
+    """
+    Spatial hash of point indices bucketed into square cells of cell_size.
+
+    Queries return indices in ascending order so that anything looping over the
+    result visits boids in the same order as a loop over the full population.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size: float = cell_size if cell_size > 0 else 1.0
+        self.cells: defaultdict = defaultdict(list)
+
+        # Range of occupied cells, bounds how far a nearest search has to look
+        self.min_cell = [math.inf, math.inf]
+        self.max_cell = [-math.inf, -math.inf]
+
+    @classmethod
+    def from_points(cls, xs, ys, cell_size: float) -> "Uniform_Grid":
+        grid = cls(cell_size)
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            grid.insert(i, x, y)
+        return grid
+
+    def cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, index: int, x: float, y: float):
+        cell = self.cell_of(x, y)
+        self.cells[cell].append(index)
+
+        for axis in (0, 1):
+            self.min_cell[axis] = min(self.min_cell[axis], cell[axis])
+            self.max_cell[axis] = max(self.max_cell[axis], cell[axis])
+
+    def query(self, x: float, y: float, radius: float) -> list[int]:
+        """
+        Indices of every point that could be within radius of (x, y), sorted ascending
+        """
+        cx, cy = self.cell_of(x, y)
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cells = self.cells
+
+        found = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                bucket = cells.get((i, j))
+                if bucket:
+                    found.extend(bucket)
+
+        found.sort()
+        return found
+
+    def ring(self, cx: int, cy: int, r: int):
+        """
+        Occupied buckets of the cells exactly r cells away (Chebyshev) from (cx, cy)
+        """
+        cells = self.cells
+        if r == 0:
+            bucket = cells.get((cx, cy))
+            if bucket:
+                yield bucket
+            return
+
+        for i in range(cx - r, cx + r + 1):
+            for j in (cy - r, cy + r):
+                bucket = cells.get((i, j))
+                if bucket:
+                    yield bucket
+
+        for j in range(cy - r + 1, cy + r):
+            for i in (cx - r, cx + r):
+                bucket = cells.get((i, j))
+                if bucket:
+                    yield bucket
+
+    def nearest(self, x: float, y: float, xs, ys) -> tuple[int, float]:
+        """
+        Index of the point (xs[i], ys[i]) closest to (x, y) and its distance, (-1, inf) if the grid is empty.
+        Ties go to the lowest index, matching a linear scan with a strict < comparison.
+        """
+        best_index = -1
+        best_dist = math.inf
+        if not self.cells:
+            return best_index, best_dist
+
+        cx, cy = self.cell_of(x, y)
+        last_ring = max(cx - self.min_cell[0], self.max_cell[0] - cx,
+                        cy - self.min_cell[1], self.max_cell[1] - cy)
+
+        r = 0
+        while r <= last_ring:
+            for bucket in self.ring(cx, cy, r):
+                for i in bucket:
+                    distance = math.dist([x, y], [xs[i], ys[i]])
+                    if distance < best_dist or (distance == best_dist and i < best_index):
+                        best_index = i
+                        best_dist = distance
+
+            # Anything in the rings further out is at least r cells away
+            if best_dist < r * self.cell_size:
+                break
+            r += 1
+
+        return best_index, best_dist
+
+class Sorted_Grid:
+    """
+    Uniform_Grid for NumPy arrays: every point's cell is packed into one integer key
+    and the points are sorted by it, so each column of cells is one contiguous run
+    found with two binary searches. Box queries return indices in ascending order.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, cell_size: float):
+        self.cell_size: float = cell_size if cell_size > 0 else 1.0
+        cx = np.floor(xs / self.cell_size).astype(np.int64)
+        cy = np.floor(ys / self.cell_size).astype(np.int64)
+
+        self.min_cell = (int(cx.min(initial=0)), int(cy.min(initial=0)))
+        self.max_cell = (int(cx.max(initial=-1)), int(cy.max(initial=-1)))
+        self.rows = self.max_cell[1] - self.min_cell[1] + 1
+
+        keys = (cx - self.min_cell[0]) * self.rows + (cy - self.min_cell[1])
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def query_box(self, x_lo: float, x_hi: float, y_lo: float, y_hi: float) -> np.ndarray:
+        """
+        Indices of every point whose cell overlaps the box, sorted ascending
+        """
+        first_col = max(math.floor(x_lo / self.cell_size), self.min_cell[0])
+        last_col = min(math.floor(x_hi / self.cell_size), self.max_cell[0])
+        first_row = max(math.floor(y_lo / self.cell_size), self.min_cell[1]) - self.min_cell[1]
+        last_row = min(math.floor(y_hi / self.cell_size), self.max_cell[1]) - self.min_cell[1]
+        if first_col > last_col or first_row > last_row:
+            return np.empty(0, dtype=np.intp)
+
+        runs = []
+        for col in range(first_col - self.min_cell[0], last_col - self.min_cell[0] + 1):
+            lo = np.searchsorted(self.keys, col * self.rows + first_row, side='left')
+            hi = np.searchsorted(self.keys, col * self.rows + last_row, side='right')
+            runs.append(self.order[lo:hi])
+
+        return np.sort(np.concatenate(runs))
+
+def swept_within(ax, ay, adx, ady, bx, by, bdx, bdy, radius):
+    """
+    Whether a point moving from (ax, ay) by (adx, ady) and one moving from (bx, by)
+    by (bdx, bdy) over the same tick come within radius of each other at any moment
+    of it. Works elementwise on arrays, one test per pair.
+    """
+    # Offset between the two and how it changes over the tick, closest at time t in [0, 1]
+    rx = ax - bx
+    ry = ay - by
+    dvx = adx - bdx
+    dvy = ady - bdy
+
+    closing_sq = dvx * dvx + dvy * dvy
+    t = np.clip(-(rx * dvx + ry * dvy) / np.where(closing_sq > 0, closing_sq, 1.0), 0.0, 1.0)
+
+    cx = rx + t * dvx
+    cy = ry + t * dvy
+    return cx * cx + cy * cy < radius * radius
@@ -0,0 +1,125 @@
+from world import simulation_from_config, run_history, convergence_monitor
+from concurrent.futures import ProcessPoolExecutor
+import configparser
+import itertools
+import argparse
+import time
+import copy
+import csv
+import os
+
+# Runs fast_sim style experiments over a grid of config.ini overrides and a list of
+# seeds, spread across a process pool, and gathers every run's per tick gene
+# averages into one table.
+#
+# ex. python3 sweep.py 2000 --seeds 0 1 2 --set Prey_Evolution.mutation_rate=0.05,0.15 --set World_Values.predator_pop_size=5,10
+
+def load_config(path: str) -> dict[str, dict[str, str]]:
+    config = configparser.ConfigParser()
+    config.read(path)
+    return {section: dict(config[section]) for section in config.sections()}
+
+def parse_override(text: str) -> tuple[str, list[str]]:
+    """
+    'Section.key=v1,v2' -> ('Section.key', ['v1', 'v2'])
+    """
+    name, _, values = text.partition('=')
+    if '.' not in name or not values:
+        raise ValueError(f"Override should look like Section.key=v1,v2 not {text}")
+    return name, values.split(',')
+
+def expand_grid(grid: dict[str, list[str]]) -> list[dict[str, str]]:
+    """
+    Every combination of the override values, one dict per combination
+    """
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[name] for name in names))]
+
+def apply_overrides(config: dict[str, dict[str, str]], overrides: dict[str, str]) -> dict[str, dict[str, str]]:
+    config = copy.deepcopy(config)
+    for name, value in overrides.items():
+        section, key = name.split('.', 1)
+        config.setdefault(section, {})[key] = value
+    return config
+
+def run_experiment(job) -> dict:
+    run_id, config, overrides, seed, ticks = job
+
+    config = apply_overrides(config, overrides)
+    sim = simulation_from_config(config, seed=seed)
+    monitor = convergence_monitor(config, sim.gene_names) # Stops the run early once its genes settle
+
+    start_time = time.perf_counter()
+    history = run_history(sim, ticks, monitor=monitor)
+    runtime = time.perf_counter() - start_time
+
+    return {
+        'run': run_id,
+        'seed': seed,
+        'overrides': overrides,
+        'runtime': runtime,
+        'stop_tick': monitor.stop_tick if monitor is not None else None,
+        'history': {param: [float(v) for v in values] for param, values in history.items()},
+    }
+
+def run_sweep(config, grid, seeds, ticks, workers=None) -> list[dict]:
+    """
+    Runs every (override combination, seed) pair for ticks ticks on a pool of workers
+    processes (default: one per core). Results come back in run order.
+    """
+    jobs = [
+        (run_id, config, overrides, seed, ticks)
+        for run_id, (overrides, seed) in enumerate(itertools.product(expand_grid(grid), seeds))
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_experiment, jobs))
+
+def write_table(results: list[dict], path: str):
+    """
+    Long format CSV: one row per run per tick with the overrides and every gene average
+    """
+    if not results:
+        return
+
+    override_names = list(results[0]['overrides'])
+    gene_names = list(results[0]['history'])
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['run', 'seed', *override_names, 'tick', *gene_names])
+
+        for result in results:
+            history = result['history']
+            ticks = len(history[gene_names[0]]) if gene_names else 0
+            for tick in range(ticks):
+                writer.writerow([result['run'], result['seed'],
+                                 *(result['overrides'][name] for name in override_names),
+                                 tick, *(history[param][tick] for param in gene_names)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many seeded fast_sim experiments in parallel")
+    parser.add_argument('ticks', type=int, help="world ticks per run")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help="seed for each repeat of a config")
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        help="Section.key=v1,v2 grid axis, can be repeated")
+    parser.add_argument('--config', default='config.ini')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    grid = dict(parse_override(text) for text in args.overrides)
+
+    start_time = time.perf_counter()
+    results = run_sweep(load_config(args.config), grid, args.seeds, args.ticks, args.workers)
+    elapsed_time = time.perf_counter() - start_time
+
+    write_table(results, args.out)
+    print(f"{len(results)} runs on {args.workers} workers in {elapsed_time:0.4f} seconds -> {args.out}")
+
+    converged = [result for result in results if result['stop_tick'] is not None]
+    if converged:
+        print(f"{len(converged)} of {len(results)} runs converged early, ticks saved: {sum(args.ticks - r['stop_tick'] for r in converged)}")
+        for result in converged:
+            print(f"  run {result['run']} (seed {result['seed']}) stopped at tick {result['stop_tick']}")
@@ -0,0 +1,530 @@
+from prey import Prey, Prey_Genome
+from predator import Predator, Predator_Genome
+from gene_stats import Gene_Stats
+from profiler import Tick_Profiler
+from Genetic_Algorithm import select_parents, breed_genes, child_positions
+from flocking_kernel import compiled_steer_prey, use_compiled_kernel
+from spatial import Sorted_Grid, swept_within
+from dataclasses import fields
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Structure-of-arrays version of Simulation. Every boid is a column in a set of
+# contiguous arrays and the whole tick runs as batched NumPy operations.
+# The rules mirror prey.py / predator.py / Genetic_Algorithm.py exactly, including
+# the order random numbers are drawn in, so a run seeded the same way as the
+# object engine produces the same statistics up to floating-point rounding.
+
+# Upper bound on the number of pairwise distances held in memory at once
+_PAIR_BLOCK = 1 << 21
+
+class Vector_Simulation:
+    engine = 'vector'
+
+    def __init__(self, prey_population: list[Prey], pred_population: list[Predator], world_bounds,
+                 prey_kernel: str = 'numpy', workers: int = 1, precision: str = 'float64', catch_mode: str = 'point'):
+        self.world_bounds = world_bounds
+
+        # Same catch rules as Simulation, see find_catches / find_swept_catches
+        if catch_mode not in ('point', 'swept'):
+            raise ValueError(f"Unknown catch_mode: {catch_mode}")
+        self.catch_mode = catch_mode
+
+        # Positions, velocities and genes are all kept in this dtype, float32 halves their memory
+        if precision not in ('float64', 'float32'):
+            raise ValueError(f"Unknown precision: {precision}")
+        self.dtype = np.dtype(precision)
+
+        # With more than one worker prey steering is split into tiles run on a thread pool
+        self.workers = max(1, workers)
+        self.pool = None
+
+        # Steer prey with the Numba compiled loop in flocking_kernel.py instead of the NumPy passes below
+        self.compiled_kernel = compiled_steer_prey() if use_compiled_kernel(prey_kernel) else None
+
+        self.gene_names = [f.name for f in fields(Prey_Genome)]
+        self.pred_gene_names = [f.name for f in fields(Predator_Genome)]
+        self.gene_index = {name: k for k, name in enumerate(self.gene_names)}
+        self.pred_gene_index = {name: k for k, name in enumerate(self.pred_gene_names)}
+
+        # Prey state, one entry per boid
+        self.x = np.array([p.x for p in prey_population], dtype=self.dtype)
+        self.y = np.array([p.y for p in prey_population], dtype=self.dtype)
+        self.vx = np.array([p.vx for p in prey_population], dtype=self.dtype)
+        self.vy = np.array([p.vy for p in prey_population], dtype=self.dtype)
+        self.age = np.array([p.age for p in prey_population], dtype=np.int64)
+
+        # Prey genes, one contiguous row per gene
+        self.genes = np.array(
+            [[getattr(p.genome, name) for p in prey_population] for name in self.gene_names],
+            dtype=self.dtype
+        ).reshape(len(self.gene_names), len(prey_population))
+
+        # Predator state
+        self.px = np.array([p.x for p in pred_population], dtype=self.dtype)
+        self.py = np.array([p.y for p in pred_population], dtype=self.dtype)
+        self.pvx = np.array([p.vx for p in pred_population], dtype=self.dtype)
+        self.pvy = np.array([p.vy for p in pred_population], dtype=self.dtype)
+        self.page = np.array([p.age for p in pred_population], dtype=np.int64)
+        self.pkills = np.array([p.kills for p in pred_population], dtype=np.int64)
+
+        self.pred_genes = np.array(
+            [[getattr(p.genome, name) for p in pred_population] for name in self.pred_gene_names],
+            dtype=self.dtype
+        ).reshape(len(self.pred_gene_names), len(pred_population))
+
+        self.gene_stats = Gene_Stats(self.gene_names, self.genes.T, lambda: self.genes.T)
+        self.tick_count = 0
+        # What happened in update_population last tick, same as Simulation's
+        self.replaced: list[int] = [] # Prey slots that were caught and refilled, in catch order
+        self.killers: list[int] = [] # Predator that made each catch
+        self.dead_ids: list[int] = [] # Id of each caught prey
+        self.parent_ids = np.empty((0, 2), dtype=np.int64) # Ids of both parents of each slot's new prey
+
+        # Every prey ever born gets the next id, prey_ids[slot] is the one living there now
+        self.prey_ids = np.arange(len(self.x), dtype=np.int64)
+        self.next_prey_id = len(self.x)
+        self.profiler = None
+
+    @classmethod
+    def from_simulation(cls, sim, prey_kernel: str = 'numpy', workers: int = 1, precision: str = 'float64') -> "Vector_Simulation":
+        """
+        Packs the populations of an object engine Simulation into arrays
+        """
+        return cls(sim.prey_population, sim.pred_population, sim.world['world_bound'], prey_kernel, workers, precision,
+                   sim.catch_mode)
+
+    def gene(self, name: str) -> np.ndarray:
+        return self.genes[self.gene_index[name]]
+
+    def pred_gene(self, name: str) -> np.ndarray:
+        return self.pred_genes[self.pred_gene_index[name]]
+
+    def prey_count(self) -> int:
+        return len(self.x)
+
+    def prey_positions(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y))
+
+    def predator_positions(self) -> np.ndarray:
+        return np.column_stack((self.px, self.py))
+
+    def prey_states(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y, self.vx, self.vy))
+
+    def predator_states(self) -> np.ndarray:
+        return np.column_stack((self.px, self.py, self.pvx, self.pvy))
+
+    def prey_genomes(self, slots=None) -> np.ndarray:
+        """
+        (len(slots), genes) array of the genomes in those prey slots, every slot by default
+        """
+        return (self.genes if slots is None else self.genes[:, slots]).T
+
+    def prey_fitness(self) -> np.ndarray:
+        return self.age.astype(np.float64) # Prey.get_fitness
+
+    def implant_genomes(self, slots, genomes: np.ndarray):
+        """
+        Gives the prey in slots new genomes (one row each) as if just born there
+        """
+        for i, row in zip(slots, genomes):
+            self.gene_stats.remove(self.genes[:, i])
+            self.genes[:, i] = row
+            self.age[i] = 0
+            self.gene_stats.add(self.genes[:, i])
+
+    def prey_gene_averages(self) -> dict[str, float]:
+        return self.gene_stats.mean()
+
+    def prey_gene_stats(self) -> dict[str, dict[str, float]]:
+        return self.gene_stats.summary()
+
+    def enable_profiling(self, profiler=None):
+        """
+        Starts recording per phase timings and counters into profiler (a new Tick_Profiler by default)
+        """
+        self.profiler = profiler or Tick_Profiler()
+        return self.profiler
+
+    def tick(self):
+        prof = self.profiler
+        if prof is not None:
+            prof.start_tick()
+
+        new_x, new_y, new_vx, new_vy = self.steer_prey()
+        if prof is not None:
+            prof.lap('prey_steering')
+
+        new_px, new_py, new_pvx, new_pvy = self.steer_predators()
+        if prof is not None:
+            prof.lap('predator_chasing')
+
+        self.x, self.y, self.vx, self.vy = new_x, new_y, new_vx, new_vy
+        self.px, self.py, self.pvx, self.pvy = new_px, new_py, new_pvx, new_pvy
+
+        self.update_population()
+        self.tick_count += 1
+
+        if prof is not None:
+            prof.end_tick()
+
+    def tiles(self) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Splits the world into one vertical strip per worker, each holding the same
+        number of prey. A tile is (rows, cols): the prey in the strip, and those plus
+        every prey within the largest visual_range of it (the halo), both ascending.
+        """
+        n = len(self.x)
+        order = np.argsort(self.x, kind='stable')
+        sorted_x = self.x[order]
+        halo = self.gene('visual_range').max(initial=0.0)
+
+        tiles = []
+        for chunk in np.array_split(np.arange(n), self.workers):
+            if len(chunk) == 0:
+                continue
+            first = np.searchsorted(sorted_x, sorted_x[chunk[0]] - halo, side='left')
+            last = np.searchsorted(sorted_x, sorted_x[chunk[-1]] + halo, side='right')
+            tiles.append((np.sort(order[chunk]), np.sort(order[first:last])))
+
+        return tiles
+
+    def in_tiles(self, work, outputs: int) -> list[np.ndarray]:
+        """
+        Runs work(rows, cols) for every tile on the worker pool and scatters each of
+        its outputs back into whole population arrays, always in tile order
+        """
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+        tiles = self.tiles()
+        merged = [np.empty(len(self.x), dtype=self.dtype) for _ in range(outputs)]
+        for (rows, cols), results in zip(tiles, self.pool.map(lambda tile: work(*tile), tiles)):
+            for out, part in zip(merged, results):
+                out[rows] = part
+
+        if self.profiler is not None:
+            self.profiler.count('neighbors_examined', sum(len(rows) * len(cols) for rows, cols in tiles))
+        return merged
+
+    def neighbor_sums(self, rows: np.ndarray = None, cols: np.ndarray = None):
+        """
+        Per prey sums over the flock: position/velocity of boids in the flocking
+        band, neighbor counts, and offsets from boids inside the protected range.
+        Covers the prey in rows looking at the prey in cols (everyone by default).
+        """
+        if rows is None:
+            rows = cols = np.arange(len(self.x))
+
+        n = len(rows)
+        x, y = self.x[rows], self.y[rows]
+        col_x, col_y = self.x[cols], self.y[cols]
+        visual_sq = self.gene('visual_range')[rows] ** 2
+        protected_sq = self.gene('protected_range')[rows] ** 2
+
+        # Summing the columns of state over a 0/1 mask gives position sums, velocity sums and counts in one product
+        state = np.column_stack((col_x, col_y, self.vx[cols], self.vy[cols], np.ones(len(cols), dtype=self.dtype)))
+        flock = np.empty((n, 5), dtype=self.dtype)
+        close = np.empty((n, 3), dtype=self.dtype)
+
+        block = max(1, _PAIR_BLOCK // max(len(cols), 1))
+        for start in range(0, n, block):
+            part = slice(start, min(start + block, n))
+
+            dist_sq = np.subtract.outer(x[part], col_x)
+            dist_sq *= dist_sq
+            dy = np.subtract.outer(y[part], col_y)
+            dy *= dy
+            dist_sq += dy
+
+            visible = dist_sq < visual_sq[part, None]
+            too_close = visible & (dist_sq <= protected_sq[part, None])
+            flocking = visible ^ too_close
+
+            flock[part] = flocking.astype(self.dtype) @ state
+            close[part] = too_close.astype(self.dtype) @ state[:, [0, 1, 4]]
+
+        # sum(x_i - x_j) over the close boids j
+        close_dx = close[:, 2] * x - close[:, 0]
+        close_dy = close[:, 2] * y - close[:, 1]
+
+        return flock[:, 0], flock[:, 1], flock[:, 2], flock[:, 3], flock[:, 4], close_dx, close_dy
+
+    def compiled_steer(self, rows: np.ndarray, cols: np.ndarray):
+        """
+        New (x, y, vx, vy) of the prey in rows, flocking with the prey in cols, from the Numba kernel
+        """
+        (x_min, x_max), (y_min, y_max) = Prey._world_bounds
+        return self.compiled_kernel(self.x, self.y, self.vx, self.vy, self.genes, self.px, self.py,
+                                    float(x_min), float(x_max), float(y_min), float(y_max), float(Prey._max_speed),
+                                    rows, cols)
+
+    def steer_prey(self):
+        """
+        Batched version of Prey.get_update_vals
+        """
+        self.age += 1
+
+        if self.compiled_kernel is not None:
+            if self.workers > 1:
+                return tuple(self.in_tiles(self.compiled_steer, 4))
+
+            if self.profiler is not None:
+                self.profiler.count('neighbors_examined', len(self.x) * len(self.x))
+            everyone = np.arange(len(self.x))
+            return self.compiled_steer(everyone, everyone)
+
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        g = self.gene
+
+        if self.workers > 1:
+            xpos_sum, ypos_sum, xvel_sum, yvel_sum, count, close_dx, close_dy = self.in_tiles(self.neighbor_sums, 7)
+        else:
+            xpos_sum, ypos_sum, xvel_sum, yvel_sum, count, close_dx, close_dy = self.neighbor_sums()
+            if self.profiler is not None:
+                self.profiler.count('neighbors_examined', len(x) * len(x))
+        if self.profiler is not None:
+            self.profiler.lap('neighbor_search')
+
+        # Avoidance Math
+        new_vx = vx + close_dx * g('avoid_factor')
+        new_vy = vy + close_dy * g('avoid_factor')
+
+        # Predator Avoidance
+        if len(self.px) > 0:
+            dx = x[:, None] - self.px[None, :]
+            dy = y[:, None] - self.py[None, :]
+            dist = np.sqrt(dx * dx + dy * dy)
+            detection = g('predator_detection_range')[:, None]
+
+            seen = (dist > 0) & (dist < detection)
+            safe_dist = np.where(seen, dist, 1.0)
+            magnitude = np.where(seen, g('predator_turn_factor')[:, None] * (1 - safe_dist / detection), 0.0)
+
+            new_vx = new_vx + ((dx / safe_dist) * magnitude).sum(axis=1)
+            new_vy = new_vy + ((dy / safe_dist) * magnitude).sum(axis=1)
+
+        # Neighborhood Math
+        has_neighbors = count > 0
+        safe_count = np.where(has_neighbors, count, 1.0)
+        new_vx = np.where(has_neighbors,
+                          new_vx + (xpos_sum / safe_count - x) * g('centering_factor')
+                                 + (xvel_sum / safe_count - vx) * g('matching_factor'),
+                          new_vx)
+        new_vy = np.where(has_neighbors,
+                          new_vy + (ypos_sum / safe_count - y) * g('centering_factor')
+                                 + (yvel_sum / safe_count - vy) * g('matching_factor'),
+                          new_vy)
+
+        # Screen margins
+        (x_min, x_max), (y_min, y_max) = Prey._world_bounds
+        margin = g('screen_margin')
+        turning = g('turning_factor')
+
+        new_vx = np.where(x < x_min + margin, new_vx + turning,
+                          np.where(x > x_max - margin, new_vx - turning, new_vx))
+        new_vy = np.where(y < y_min + margin, new_vy + turning,
+                          np.where(y > y_max - margin, new_vy - turning, new_vy))
+
+        # Add bias
+        theta = np.radians(g('bias_direction'))
+        bias_val = g('bias_val')
+        new_vx = (1 - bias_val) * new_vx + bias_val * np.cos(theta)
+        new_vy = (1 - bias_val) * new_vy + bias_val * np.sin(theta)
+
+        # Propulsion towards the prefered speed
+        speed = np.sqrt(new_vx * new_vx + new_vy * new_vy)
+        moving = speed > 0
+        safe_speed = np.where(moving, speed, 1.0)
+        push = np.where(moving, g('propulsion') * (g('speed_pref') - speed), 0.0)
+        new_vx = new_vx + push * (new_vx / safe_speed)
+        new_vy = new_vy + push * (new_vy / safe_speed)
+
+        # Speed limit (checked against the speed before propulsion, like Prey)
+        too_fast = speed > Prey._max_speed
+        new_vx = np.where(too_fast, new_vx / safe_speed * Prey._max_speed, new_vx)
+        new_vy = np.where(too_fast, new_vy / safe_speed * Prey._max_speed, new_vy)
+
+        return x + new_vx, y + new_vy, new_vx, new_vy
+
+    def steer_predators(self):
+        """
+        Batched version of Predator.get_update_vals (chase the nearest prey)
+        """
+        self.page += 1
+
+        px, py = self.px, self.py
+        if len(self.x) == 0 or len(px) == 0:
+            zeros = np.zeros(len(px), dtype=self.dtype)
+            return px.copy(), py.copy(), zeros, zeros.copy()
+
+        dx = self.x[None, :] - px[:, None]
+        dy = self.y[None, :] - py[:, None]
+        dist = np.sqrt(dx * dx + dy * dy)
+
+        nearest = np.argmin(dist, axis=1)
+        rows = np.arange(len(px))
+        min_dist = dist[rows, nearest]
+
+        chasing = min_dist > 0
+        safe_dist = np.where(chasing, min_dist, 1.0)
+        ux = np.where(chasing, dx[rows, nearest] / safe_dist, 0.0)
+        uy = np.where(chasing, dy[rows, nearest] / safe_dist, 0.0)
+
+        speed_pref = self.pred_gene('speed_pref')
+        new_pvx = ux * speed_pref
+        new_pvy = uy * speed_pref
+
+        return px + new_pvx, py + new_pvy, new_pvx, new_pvy
+
+    def find_catches(self) -> tuple[list[int], list[int]]:
+        """
+        Same catch rule as Simulation.update_population: each predator in turn takes
+        the first prey inside its catch_radius that hasn't already been caught.
+        Returns the caught prey slots and the predator that caught each
+        """
+        if self.catch_mode == 'swept':
+            return self.find_swept_catches()
+
+        killed = []
+        killers = []
+        if len(self.x) == 0:
+            return killed, killers
+
+        if self.profiler is not None:
+            self.profiler.count('catch_candidates', len(self.x) * len(self.px))
+
+        available = np.ones(len(self.x), dtype=bool)
+        catch_radius = self.pred_gene('catch_radius')
+
+        for i in range(len(self.px)):
+            dx = self.px[i] - self.x
+            dy = self.py[i] - self.y
+            dist = np.sqrt(dx * dx + dy * dy)
+
+            hits = np.flatnonzero(available & (dist < catch_radius[i]))
+            if len(hits) > 0:
+                available[hits[0]] = False
+                killed.append(int(hits[0]))
+                killers.append(i)
+                self.pkills[i] += 1
+
+        return killed, killers
+
+    def find_swept_catches(self) -> tuple[list[int], list[int]]:
+        """
+        find_catches tested along the straight paths every boid took this tick: a prey
+        is caught if it came within catch_radius of the predator at any moment. Prey
+        near each predator's path are picked out with a Sorted_Grid of where they
+        started, then every (predator, candidate) pair is tested in one batch.
+        """
+        killed = []
+        killers = []
+        if len(self.x) == 0 or len(self.px) == 0:
+            return killed, killers
+
+        # This tick's move was the current velocity, so each path ends at the current position
+        x0, y0 = self.x - self.vx, self.y - self.vy
+        px0, py0 = self.px - self.pvx, self.py - self.pvy
+        catch_radius = self.pred_gene('catch_radius')
+        reach = catch_radius + np.sqrt(self.vx * self.vx + self.vy * self.vy).max()
+
+        grid = Sorted_Grid(x0, y0, float(reach.max()))
+        candidates = [
+            grid.query_box(min(px0[i], self.px[i]) - reach[i], max(px0[i], self.px[i]) + reach[i],
+                           min(py0[i], self.py[i]) - reach[i], max(py0[i], self.py[i]) + reach[i])
+            for i in range(len(self.px))
+        ]
+        pred = np.repeat(np.arange(len(self.px)), [len(c) for c in candidates])
+        prey = np.concatenate(candidates)
+
+        if self.profiler is not None:
+            self.profiler.count('catch_candidates', len(prey))
+
+        hit = swept_within(px0[pred], py0[pred], self.pvx[pred], self.pvy[pred],
+                           x0[prey], y0[prey], self.vx[prey], self.vy[prey], catch_radius[pred])
+        pred, prey = pred[hit], prey[hit]
+
+        # Predators still go in turn, each taking its lowest numbered hit nobody has caught yet
+        available = np.ones(len(self.x), dtype=bool)
+        bounds = np.searchsorted(pred, np.arange(len(self.px) + 1))
+        for i in range(len(self.px)):
+            for j in prey[bounds[i]:bounds[i + 1]].tolist():
+                if available[j]:
+                    available[j] = False
+                    killed.append(j)
+                    killers.append(i)
+                    self.pkills[i] += 1
+                    break
+
+        return killed, killers
+
+    def update_population(self):
+        killed, killers = self.find_catches()
+        self.replaced = killed
+        self.killers = killers
+
+        prof = self.profiler
+        if prof is not None:
+            prof.lap('catch_detection')
+            prof.record_kills(len(killed))
+
+        if not killed:
+            self.dead_ids = []
+            self.parent_ids = np.empty((0, 2), dtype=np.int64)
+            return
+
+        for i in killed:
+            self.gene_stats.remove(self.genes[:, i])
+
+        # Dead prey keep their slots until their children move in, nothing is shifted or reallocated
+        alive = np.ones(len(self.x), dtype=bool)
+        alive[killed] = False
+        if prof is not None:
+            prof.lap('removal')
+
+        children, parents = self.breed(len(killed), np.flatnonzero(alive), with_parents=True)
+        self.dead_ids = self.prey_ids[killed].tolist()
+        self.parent_ids = self.prey_ids[parents]
+        self.place_children(killed, *children)
+        self.prey_ids[killed] = np.arange(self.next_prey_id, self.next_prey_id + len(killed))
+        self.next_prey_id += len(killed)
+        if prof is not None:
+            prof.lap('breeding')
+            prof.count('breed_calls', len(killed))
+
+    def breed(self, k: int = 1, parents_from: np.ndarray = None, with_parents: bool = False):
+        """
+        Genetic_Algorithm.breed_batch straight on the gene arrays, returns the k
+        children's (genes, x, y, vx, vy) with genes shaped (k, genes).
+        Parents are drawn from the slots in parents_from (every slot by default).
+        With with_parents, returns (children, (k, 2) array of the parents' slots).
+        """
+        if parents_from is None:
+            parents_from = np.arange(len(self.x))
+
+        parents = parents_from[select_parents(self.age[parents_from].astype(np.float64), k, Prey._selection_type,
+                                                Prey._tournament_size)]
+        first, second = parents[:, 0], parents[:, 1]
+
+        genes = breed_genes(self.genes[:, first].T, self.genes[:, second].T, Prey._crossover_type, Prey._mutation_rate)
+        xs, ys = child_positions(k, Prey._world_bounds)
+
+        children = (genes, xs, ys, self.vx[first], self.vy[first])
+        return (children, parents) if with_parents else children
+
+    def place_children(self, slots, genes, xs, ys, vxs, vys):
+        """
+        Writes each child into the matching slot in place
+        """
+        self.x[slots] = xs
+        self.y[slots] = ys
+        self.vx[slots] = vxs
+        self.vy[slots] = vys
+        self.age[slots] = 0
+        self.genes[:, slots] = genes.T
+
+        # Count the genes as stored, in float32 they're rounded and remove() will take off the rounded values
+        for row in self.genes[:, slots].T:
+            self.gene_stats.add(row)
@@ -0,0 +1,245 @@
+import numpy as np
+import threading
+import asyncio
+import hashlib
+import base64
+import struct
+import json
+import time
+import os
+
+# Local web viewer: runs a simulation headless and streams it to any number of
+# browsers watching index.html. Only the standard library is used for the HTTP and
+# WebSocket side, so nothing beyond numpy is needed to serve.
+#
+# Every frame is sent as one binary WebSocket message, little endian:
+#   uint32 tick, uint32 prey count, uint32 predator count,
+#   float32 prey (x, y) pairs, float32 predator (x, y) pairs
+# Everything else is a JSON text message with a 'type':
+#   'hello'   world bounds and gene names, sent once on connect
+#   'genes'   mean/variance/min/max of every prey gene, every gene_every frames
+#   'dropped' how many frames this client has missed, sent when it falls behind
+#
+# ex. python3 world.py serve 8000
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B65"
+_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+
+def encode_frame(tick: int, prey_positions: np.ndarray, predator_positions: np.ndarray) -> bytes:
+    prey = np.ascontiguousarray(prey_positions, dtype='<f4')
+    preds = np.ascontiguousarray(predator_positions, dtype='<f4')
+    return struct.pack('<III', tick, len(prey), len(preds)) + prey.tobytes() + preds.tobytes()
+
+def ws_message(payload: bytes | str, opcode: int | None = None) -> bytes:
+    """
+    One unmasked, unfragmented server to client WebSocket message. The opcode defaults
+    to text for str and binary for bytes, pass one for control frames like pong
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+        opcode = 0x1 if opcode is None else opcode
+    elif opcode is None:
+        opcode = 0x2
+
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return header + payload
+
+class Viewer_Client:
+    """
+    One connected browser. Holds at most the newest frame, a frame that gets
+    replaced before it could be sent is counted as dropped.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.frame: bytes | None = None
+        self.messages: list[str] = []
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.reported_dropped = 0
+
+    def push_frame(self, frame: bytes):
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self.ready.set()
+
+    def push_message(self, message: str):
+        self.messages.append(message)
+        self.ready.set()
+
+    async def send_loop(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+
+            if self.dropped != self.reported_dropped:
+                self.reported_dropped = self.dropped
+                self.messages.append(json.dumps({'type': 'dropped', 'count': self.dropped}))
+
+            messages, self.messages = self.messages, []
+            frame, self.frame = self.frame, None
+
+            for message in messages:
+                self.writer.write(ws_message(message))
+            if frame is not None:
+                self.writer.write(ws_message(frame))
+            await self.writer.drain() # A slow client waits here while newer frames replace its pending one
+
+class Viewer_Server:
+    """
+    Steps sim on a background thread at fps frames a second, ticks_per_frame ticks
+    each, and broadcasts every frame to all connected clients
+    """
+
+    def __init__(self, sim, ticks_per_frame: int = 1, fps: float = 30.0, gene_every: int = 10):
+        # Checked here, on the simulation thread a bad value would only kill the thread and freeze every client
+        if gene_every < 1:
+            raise ValueError(f"gene_every should be at least 1 frame, not {gene_every}")
+
+        self.sim = sim
+        self.ticks_per_frame = ticks_per_frame
+        self.fps = fps
+        self.gene_every = gene_every
+
+        self.clients: set[Viewer_Client] = set()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.stop = threading.Event()
+        self.frames = 0
+
+    def hello(self) -> str:
+        world_values = self.sim.config['World_Values']
+        return json.dumps({
+            'type': 'hello',
+            'bounds': [float(world_values[k]) for k in ('xmin', 'xmax', 'ymin', 'ymax')],
+            'genes': list(self.sim.gene_names),
+        })
+
+    def genes(self) -> str:
+        return json.dumps({'type': 'genes', 'tick': self.sim.tick_count, 'stats': self.sim.prey_gene_stats()})
+
+    def broadcast(self, frame: bytes, message: str | None):
+        for client in self.clients:
+            client.push_frame(frame)
+            if message is not None:
+                client.push_message(message)
+
+    def run_simulation(self):
+        """
+        Simulation thread: ticks, encodes each frame once and hands it to the event loop
+        """
+        period = 1.0 / self.fps
+        next_frame = time.perf_counter()
+
+        while not self.stop.is_set():
+            for _ in range(self.ticks_per_frame):
+                self.sim.tick()
+
+            frame = encode_frame(self.sim.tick_count, self.sim.prey_positions(), self.sim.predator_positions())
+            message = self.genes() if self.frames % self.gene_every == 0 else None
+            self.frames += 1
+            self.loop.call_soon_threadsafe(self.broadcast, frame, message)
+
+            next_frame += period
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                self.stop.wait(delay)
+            else:
+                next_frame = time.perf_counter() # Running behind, don't try to catch up
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+
+        lines = request.decode('latin-1').split('\r\n')
+        path = lines[0].split(' ')[1] if len(lines[0].split(' ')) > 1 else '/'
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+            if 'sec-websocket-key' not in headers:
+                writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                writer.close()
+                return
+            await self.serve_websocket(reader, writer, headers['sec-websocket-key'])
+        elif path in ('/', '/index.html'):
+            with open(_INDEX, 'rb') as f:
+                body = f.read()
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n'
+                         b'Content-Length: ' + str(len(body)).encode() + b'\r\nConnection: close\r\n\r\n' + body)
+            await writer.drain()
+            writer.close()
+        else:
+            writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            writer.close()
+
+    async def serve_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, key: str):
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+
+        client = Viewer_Client(writer)
+        client.push_message(self.hello())
+        self.clients.add(client)
+        sender = asyncio.create_task(client.send_loop())
+
+        try:
+            # Clients only ever send a close (or the odd ping), just wait for the close
+            while True:
+                head = await reader.readexactly(2)
+                opcode, length = head[0] & 0x0F, head[1] & 0x7F
+                if length == 126:
+                    length = struct.unpack('!H', await reader.readexactly(2))[0]
+                elif length == 127:
+                    length = struct.unpack('!Q', await reader.readexactly(8))[0]
+                mask = await reader.readexactly(4) if head[1] & 0x80 else b'\0\0\0\0'
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+
+                if opcode == 0x8:
+                    writer.write(struct.pack('!BB', 0x88, 0))
+                    break
+                if opcode == 0x9:
+                    writer.write(ws_message(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self.handle, host, port)
+
+        thread = threading.Thread(target=self.run_simulation, daemon=True)
+        thread.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.stop.set()
+
+def serve(sim, host: str = '127.0.0.1', port: int = 8000, ticks_per_frame: int = 1, fps: float = 30.0, gene_every: int = 10):
+    """
+    Runs sim and serves the viewer at http://host:port/ until interrupted
+    """
+    server = Viewer_Server(sim, ticks_per_frame, fps, gene_every)
+    print(f"Viewer at http://{host}:{port}/")
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -1,21 +1,26 @@
-from boid import Boid, Genome
+from boid import Boid, Genome, State_Buffer
 from prey import Prey, Prey_Genome
 from predator import Predator, Predator_Genome
 import configparser
-from dataclasses import replace
 import random
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import math
-from Genetic_Algorithm import breed
+from Genetic_Algorithm import breed_batch, fitness_vector
 from collections import defaultdict
+from spatial import Uniform_Grid, swept_within
+from recording import History_Writer, Trajectory_Writer, Trajectory, Event_Log
+from gene_stats import Gene_Stats
+from convergence import Convergence_Monitor
+from checkpoint import save_checkpoint, load_checkpoint
+from profiler import Tick_Profiler
+from dataclasses import replace, fields
 import numpy as np
 import sys
 import time
 
 class Simulation:
+    engine = 'object'
 
-    def __init__(self, world_params, prey_genome_params, pred_genome_params):
+    def __init__(self, world_params, prey_genome_params, pred_genome_params, prey_evolution_params=None, pred_evolution_params=None):
 
         self.world = {}
 
@@ -31,13 +36,53 @@ class Simulation:
         world_bounds = ((x_min, x_max), (y_min, y_max))
         Boid.set_world_bounds(world_bounds)
 
-        #TODO: Set Evolution Parameters for Prey and Predators from ini
-        
+        # 'grid' buckets prey into cells the size of the largest visual_range, shared by flocking,
+        # chasing and catching each tick. 'brute' checks every pair
+        self.neighbor_search = world_params.get('neighbor_search', 'grid')
+        if self.neighbor_search not in ('grid', 'brute'):
+            raise ValueError(f"Unknown neighbor_search: {self.neighbor_search}")
+
+        # 'point' catches prey within catch_radius of a predator once everyone has moved, 'swept'
+        # tests the whole path both took during the tick so fast predators can't pass through prey
+        self.catch_mode = world_params.get('catch_mode', 'point')
+        if self.catch_mode not in ('point', 'swept'):
+            raise ValueError(f"Unknown catch_mode: {self.catch_mode}")
+
+        if prey_evolution_params is not None:
+            self.set_evolution_params(Prey, prey_evolution_params)
+        if pred_evolution_params is not None:
+            self.set_evolution_params(Predator, pred_evolution_params)
+
         # World Dictionary
         self.world['prey_population'] = self.prey_population
         self.world['predator_population'] = self.pred_population
+        self.rebuild_state_buffers()
         self.world['world_bound'] = world_bounds
+        self.world['prey_grid'] = None
+
+        self.gene_stats = Gene_Stats(self.gene_names, [p.genome.values() for p in self.prey_population],
+                                     lambda: [p.genome.values() for p in self.prey_population])
+        self.tick_count = 0
+        # What happened in update_population last tick, for recorders to pick up afterwards
+        self.replaced: list[int] = [] # Prey slots that were caught and refilled, in catch order
+        self.killers: list[int] = [] # Predator that made each catch
+        self.dead_ids: list[int] = [] # Id of each caught prey
+        self.parent_ids = np.empty((0, 2), dtype=np.int64) # Ids of both parents of each slot's new prey
+
+        # Every prey ever born gets the next id, prey_ids[slot] is the one living there now
+        self.prey_ids: list[int] = list(range(len(self.prey_population)))
+        self.next_prey_id: int = len(self.prey_population)
+
+        self.profiler = None
+        self.world['profiler'] = None
+
 
+    def set_evolution_params(self, boid_type, evolution_params):
+        boid_type.set_mutation_rate(float(evolution_params['mutation_rate']))
+        boid_type.set_crossover_type(evolution_params['crossover_type'].strip('"'))
+        boid_type.set_selection_type(evolution_params['selection_type'].strip('"'))
+        if 'tournament_size' in evolution_params:
+            boid_type.set_tournament_size(int(evolution_params['tournament_size']))
 
     def generate_prey_population(self, population_size, variation_rate, genome_params):
         default_genome = Prey_Genome(
@@ -67,63 +112,319 @@ class Simulation:
             for _ in range(population_size)
         ]
 
+    @property
+    def gene_names(self) -> list[str]:
+        return [f.name for f in fields(Prey_Genome)]
+
+    def prey_count(self) -> int:
+        return len(self.prey_population)
+
+    def prey_positions(self) -> np.ndarray:
+        return np.column_stack((self.prey_state.x, self.prey_state.y)).reshape(-1, 2)
+
+    def predator_positions(self) -> np.ndarray:
+        return np.column_stack((self.pred_state.x, self.pred_state.y)).reshape(-1, 2)
+
+    def prey_states(self) -> np.ndarray:
+        state = self.prey_state
+        return np.column_stack((state.x, state.y, state.vx, state.vy)).reshape(-1, 4)
+
+    def predator_states(self) -> np.ndarray:
+        state = self.pred_state
+        return np.column_stack((state.x, state.y, state.vx, state.vy)).reshape(-1, 4)
+
+    def prey_genomes(self, slots=None) -> np.ndarray:
+        """
+        (len(slots), genes) array of the genomes in those prey slots, every slot by default
+        """
+        prey = self.prey_population if slots is None else [self.prey_population[i] for i in slots]
+        return np.array([p.genome.values() for p in prey], dtype=np.float64).reshape(len(prey), len(self.gene_names))
+
+    def prey_fitness(self) -> np.ndarray:
+        return fitness_vector(self.prey_population)
+
+    def implant_genomes(self, slots, genomes: np.ndarray):
+        """
+        Gives the prey in slots new genomes (one row each) as if just born there
+        """
+        for i, row in zip(slots, genomes):
+            prey = self.prey_population[i]
+            self.gene_stats.remove(prey.genome.values())
+            prey.genome = Prey_Genome.from_array(row)
+            prey.age = 0
+            self.gene_stats.add(prey.genome.values())
+
+    def prey_gene_averages(self) -> dict[str, float]:
+        return self.gene_stats.mean()
+
+    def prey_gene_stats(self) -> dict[str, dict[str, float]]:
+        return self.gene_stats.summary()
+
+    def build_prey_grid(self):
+        if self.neighbor_search != 'grid' or not self.prey_population:
+            return None
+
+        cell_size = max(p.genome.visual_range for p in self.prey_population)
+        return Uniform_Grid.from_points(self.prey_state.x, self.prey_state.y, cell_size)
+
+    def rebuild_state_buffers(self):
+        """
+        Packs both populations' positions and velocities into fresh buffers in population order
+        """
+        self.prey_state = State_Buffer.from_boids(self.prey_population)
+        self.pred_state = State_Buffer.from_boids(self.pred_population)
+        self.world['prey_state'] = self.prey_state
+        self.world['predator_state'] = self.pred_state
+
+    def enable_profiling(self, profiler=None):
+        """
+        Starts recording per phase timings and counters into profiler (a new Tick_Profiler by default)
+        """
+        self.profiler = profiler or Tick_Profiler()
+        self.world['profiler'] = self.profiler
+        return self.profiler
+
     def tick(self):
+        prof = self.profiler
+        if prof is not None:
+            prof.start_tick()
+
+        self.world['prey_grid'] = self.build_prey_grid()
+        if prof is not None:
+            prof.lap('grid_build')
+
         for prey in self.prey_population:
             prey.get_update_vals(self.world)
+        if prof is not None:
+            prof.lap('prey_steering')
         
         for pred in self.pred_population:
             pred.get_update_vals(self.world)
+        if prof is not None:
+            prof.lap('predator_chasing')
         
-        for boid in self.prey_population:
-            boid.update_vals()
-
-        for boid in self.pred_population:
-            boid.update_vals()
+        # Everyone wrote their next state, make it current in one go
+        self.prey_state.swap()
+        self.pred_state.swap()
+        if prof is not None:
+            prof.lap('apply_updates')
 
         self.update_population()
+        self.tick_count += 1
+
+        if prof is not None:
+            prof.end_tick()
+
+    def find_point_catches(self):
+        """
+        Each predator in turn takes the first prey within its catch_radius that hasn't
+        already been caught. Returns the caught slots in catch order (so the running gene
+        stats are updated in a fixed order), the predator that caught each, and them as a set
+        """
+        killed = []
+        killers = []
+        caught = set()
+        grid = self.world['prey_grid']
+        state = self.prey_state
+        xs, ys = state.x, state.y
+
+        if grid is not None:
+            # The grid holds positions from the start of the tick, widen the search by how far any prey has moved since
+            moved = max(map(math.hypot, state.vx, state.vy), default=0.0)
 
-    def update_population(self):
-        killed_prey = set()
-        
         # TODO: Find a way to have this happen in the existing update loops
-        for pred in self.pred_population:
-            for prey in self.prey_population:
-                # NOTE: This can be done with intersecting paths to avoid tunneling, using radius for now.
-                if prey in killed_prey:
+        for k, pred in enumerate(self.pred_population):
+            if grid is not None:
+                candidates = grid.query(pred.x, pred.y, pred.genome.catch_radius + moved)
+            else:
+                candidates = range(len(xs))
+
+            if self.profiler is not None:
+                self.profiler.count('catch_candidates', len(candidates))
+
+            pred_x, pred_y = pred.x, pred.y
+            for i in candidates:
+                # NOTE: Fast predators can tunnel through prey here, catch_mode = swept tests the paths instead
+                if i in caught:
                     continue
 
-                distance = math.dist([pred.x, pred.y], [prey.x, prey.y])
+                distance = math.dist([pred_x, pred_y], [xs[i], ys[i]])
 
                 if distance < pred.genome.catch_radius:
-                    killed_prey.add(prey)
+                    killed.append(i)
+                    killers.append(k)
+                    caught.add(i)
+                    pred.count_kill()
+                    break # (Only kill 1 prey at a time)
+
+        return killed, killers, caught
+
+    def find_swept_catches(self):
+        """
+        find_point_catches tested along the straight paths every boid took this tick:
+        a prey is caught if it came within catch_radius of the predator at any moment
+        """
+        killed = []
+        killers = []
+        caught = set()
+        grid = self.world['prey_grid']
+        state = self.prey_state
+
+        # This tick's move was the current velocity, so each path ends at the current position
+        vx = np.array(state.vx)
+        vy = np.array(state.vy)
+        x0 = np.array(state.x) - vx
+        y0 = np.array(state.y) - vy
+        moved = float(np.sqrt(vx * vx + vy * vy).max(initial=0.0))
+        everyone = np.arange(len(vx))
+
+        for k, pred in enumerate(self.pred_population):
+            radius = pred.genome.catch_radius
+            pred_vx, pred_vy = pred.vx, pred.vy
+            pred_x0, pred_y0 = pred.x - pred_vx, pred.y - pred_vy
+
+            if grid is not None:
+                # The grid holds where prey started the tick, search around the middle of the predator's path
+                reach = math.hypot(pred_vx, pred_vy) / 2 + radius + moved
+                candidates = np.array(grid.query(pred_x0 + pred_vx / 2, pred_y0 + pred_vy / 2, reach), dtype=np.intp)
+            else:
+                candidates = everyone
+
+            if self.profiler is not None:
+                self.profiler.count('catch_candidates', len(candidates))
+
+            hits = candidates[swept_within(pred_x0, pred_y0, pred_vx, pred_vy, x0[candidates], y0[candidates],
+                                           vx[candidates], vy[candidates], radius)]
+            for i in hits.tolist():
+                if i not in caught:
+                    killed.append(i)
+                    killers.append(k)
+                    caught.add(i)
+                    pred.count_kill()
                     break # (Only kill 1 prey at a time)
 
-        for p in killed_prey:
-            self.prey_population.remove(p)
+        return killed, killers, caught
 
-        for _ in range(len(killed_prey)):
-            self.prey_population.append(breed(self.prey_population))
+    def update_population(self):
+        if self.catch_mode == 'swept':
+            killed, killers, caught = self.find_swept_catches()
+        else:
+            killed, killers, caught = self.find_point_catches()
+        state = self.prey_state
+
+        self.replaced = killed
+        self.killers = killers
+
+        prof = self.profiler
+        if prof is not None:
+            prof.lap('catch_detection')
+            prof.record_kills(len(killed))
+
+        if not killed:
+            self.dead_ids = []
+            self.parent_ids = np.empty((0, 2), dtype=np.int64)
+            return
+
+        # Dead prey stay in their slots until a child takes each one over, so no list
+        # or buffer entry moves and the slot indices stay valid
+        for i in killed:
+            self.gene_stats.remove(self.prey_population[i].genome.values())
+        survivor_slots = [i for i in range(len(self.prey_population)) if i not in caught]
+        survivors = [self.prey_population[i] for i in survivor_slots]
+        if prof is not None:
+            prof.lap('removal')
+
+        # Fitness is taken once from the survivors, then every child is bred from it
+        children, parents = breed_batch(survivors, len(killed), fitness_vector(survivors), with_parents=True)
+
+        ids = self.prey_ids
+        self.dead_ids = [ids[i] for i in killed]
+        self.parent_ids = np.array([[ids[survivor_slots[a]], ids[survivor_slots[b]]] for a, b in parents.tolist()],
+                                   dtype=np.int64).reshape(-1, 2)
+
+        for i, child in zip(killed, children):
+            self.prey_population[i] = child
+            state.place(i, child)
+            self.gene_stats.add(child.genome.values())
+            ids[i] = self.next_prey_id
+            self.next_prey_id += 1
+        if prof is not None:
+            prof.lap('breeding')
+            prof.count('breed_calls', len(killed))
+
+def build_simulation(world_params, prey_genome_params, pred_genome_params, engine=None,
+                     prey_evolution_params=None, pred_evolution_params=None, seed=None):
+    """
+    Creates a Simulation with the engine named in world_params (or engine if given)
 
-def real_time(sim, genome_params):
+    'object' steps every boid as its own Python object, 'vector' packs the same
+    starting populations into arrays and runs the tick as batched NumPy operations.
+    Passing a seed makes the run reproducible.
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    sim = Simulation(world_params, prey_genome_params, pred_genome_params, prey_evolution_params, pred_evolution_params)
+    engine = engine or world_params.get('engine', 'object')
+
+    match engine:
+        case 'object':
+            pass
+        case 'vector':
+            from vector_world import Vector_Simulation # Only vector runs pay for it (and for Numba if it compiles)
+            sim = Vector_Simulation.from_simulation(sim, world_params.get('prey_kernel', 'auto'),
+                                                    int(world_params.get('workers', 1)),
+                                                    world_params.get('precision', 'float64'))
+        case _:
+            raise ValueError(f"Unknown engine: {engine}")
+
+    # Kept so a checkpoint can rebuild the same simulation
+    sim.config = {
+        'World_Values': dict(world_params),
+        'Prey_Values': dict(prey_genome_params),
+        'Predator_Values': dict(pred_genome_params),
+    }
+    if prey_evolution_params is not None:
+        sim.config['Prey_Evolution'] = dict(prey_evolution_params)
+    if pred_evolution_params is not None:
+        sim.config['Predator_Evolution'] = dict(pred_evolution_params)
+
+    return sim
+
+def real_time(sim, genome_params, ticks_per_frame=1, target_tps=0.0, gene_every=10):
+    """
+    Animates the simulation. Each frame advances ticks_per_frame ticks, or with a
+    target_tps the simulation runs on its own thread at that many ticks a second
+    and frames just show its latest state. The boids are blitted every frame, the
+    gene plots only refresh every gene_every frames.
+    """
     #NOTE: The code below that handles the plotting was made with help of Claude AI, I am planning to make this some kind of accessable web app so this is a placeholder visualization for testing.
+    import matplotlib.pyplot as plt # Only pulled in when plotting so headless runs never need a display
+    from matplotlib.animation import FuncAnimation
+    import threading
+
+    world_values = sim.config['World_Values']
+
     fig = plt.figure(figsize=(20, 10))
     gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)
 
     # Main sim plot
     ax_sim = fig.add_subplot(gs[:, 0:2])
     ax_sim.set_title('Simulation')
-    ax_sim.set_xlim(float(config["World_Values"]['xmin']), float(config["World_Values"]['xmax']))
-    ax_sim.set_ylim(float(config["World_Values"]["ymin"]), float(config["World_Values"]["ymax"]))
+    ax_sim.set_xlim(float(world_values['xmin']), float(world_values['xmax']))
+    ax_sim.set_ylim(float(world_values["ymin"]), float(world_values["ymax"]))
 
-    # Scatter plots for sim
-    prey_scat = ax_sim.scatter([], [], c='blue', label='Prey', s=20)
-    pred_scat = ax_sim.scatter([], [], c='red', label='Predators', s=30)
+    # Scatter plots for sim, animated so only they get redrawn each frame
+    prey_scat = ax_sim.scatter([], [], c='blue', label='Prey', s=20, animated=True)
+    pred_scat = ax_sim.scatter([], [], c='red', label='Predators', s=30, animated=True)
+    status = ax_sim.text(0.01, 0.99, '', transform=ax_sim.transAxes, va='top', animated=True)
     ax_sim.legend()
 
     # Create subplots for each genome parameter
     param_axes = {}
     param_lines = {}
-    history = defaultdict(list)
+    history = {param: [] for param in genome_params}
 
     for idx, param in enumerate(genome_params):
         row = idx // 2
@@ -133,78 +434,272 @@ def real_time(sim, genome_params):
         ax.set_xlabel('Generation')
         ax.set_ylabel('Value')
         param_axes[param] = ax
-        line, = ax.plot([], [], 'b-', linewidth=2)
+        line, = ax.plot([], [], 'b-', linewidth=2, animated=True)
         param_lines[param] = line
 
+    def step():
+        sim.tick()
+        if sim.prey_count():
+            averages = sim.prey_gene_averages()
+            for param in genome_params:
+                history[param].append(averages[param])
+
+    # With a target rate the simulation gets its own thread and frames only read from it
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def run_in_background():
+        period = 1.0 / target_tps
+        next_tick = time.perf_counter()
+        while not stop.is_set():
+            with lock:
+                step()
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                next_tick = time.perf_counter() # Running behind, don't try to catch up
+
+    def rescale_gene_axes() -> bool:
+        """
+        Grows the gene axes (by half again) once a line leaves them, True if any changed
+        """
+        rescaled = False
+        for param, values in history.items():
+            if not values:
+                continue
+            ax = param_axes[param]
+            x_max = ax.get_xlim()[1]
+            y_min, y_max = ax.get_ylim()
+            low, high = min(values), max(values)
+
+            if len(values) > x_max:
+                ax.set_xlim(0, len(values) * 1.5)
+                rescaled = True
+            if low < y_min or high > y_max or ax.get_autoscaley_on(): # Autoscale is still on until the first fit
+                pad = max(high - low, abs(high) * 0.05, 1e-9) * 0.5
+                ax.set_ylim(low - pad, high + pad)
+                ax.set_autoscaley_on(False)
+                rescaled = True
+        return rescaled
+
     frame_count = 0
 
     def update(frame):
         nonlocal frame_count
         frame_count += 1
-    
-        sim.tick()
-    
-        # Update prey positions
-        prey_x = [b.x for b in sim.prey_population]
-        prey_y = [b.y for b in sim.prey_population]
-        prey_scat.set_offsets(list(zip(prey_x, prey_y)))
-    
-        # Update predator positions
-        pred_x = [p.x for p in sim.pred_population]
-        pred_y = [p.y for p in sim.pred_population]
-        pred_scat.set_offsets(list(zip(pred_x, pred_y)))
-    
-        # Calculate and store average genome parameters
-        if sim.prey_population:
-            for param in genome_params:
-                values = [getattr(b.genome, param) for b in sim.prey_population]
-                avg_value = np.mean(values)
-                history[param].append(avg_value)
-            
-                # Update the corresponding line plot
-                generations = list(range(len(history[param])))
-                param_lines[param].set_data(generations, history[param])
-            
-                # Adjust axis limits
-                ax = param_axes[param]
-                ax.relim()
-                ax.autoscale_view()
-    
-        # Update title with population counts
-        ax_sim.set_title(f'Simulation - Frame {frame_count} | Prey: {len(sim.prey_population)} | Predators: {len(sim.pred_population)}')
-    
-        return [prey_scat, pred_scat] + list(param_lines.values())
 
-    ani = FuncAnimation(fig, update, frames=None, interval=30, blit=False)
-    plt.show() 
+        with lock:
+            if target_tps <= 0:
+                for _ in range(ticks_per_frame):
+                    step()
 
-def fast_sim(sim, itterations):
-    history = defaultdict(list)
-    gene_names = list(vars(sim.prey_population[0].genome).keys())
-    
-    start_time = time.perf_counter()
+            prey_scat.set_offsets(sim.prey_positions())
+            pred_scat.set_offsets(sim.predator_positions())
+            status.set_text(f'Frame {frame_count} | Tick {sim.tick_count} | Prey: {sim.prey_count()} | Predators: {len(sim.predator_positions())}')
+
+            if gene_every <= 1 or frame_count % gene_every == 1:
+                for param in genome_params:
+                    param_lines[param].set_data(range(len(history[param])), history[param])
+
+                # Axis limits aren't blitted, redraw the whole figure on the rare frames they move
+                if rescale_gene_axes():
+                    fig.canvas.draw()
+
+        return [prey_scat, pred_scat, status] + list(param_lines.values())
+
+    if target_tps > 0:
+        fig.canvas.mpl_connect('close_event', lambda event: stop.set())
+        threading.Thread(target=run_in_background, daemon=True).start()
+
+    ani = FuncAnimation(fig, update, frames=None, interval=30, blit=True, cache_frame_data=False)
+    plt.show()
+    stop.set()
+
+def real_time_options(config) -> dict:
+    """
+    real_time's pacing settings from the [Real_Time] section, defaults if it's missing
+    """
+    section = config['Real_Time'] if 'Real_Time' in config else {}
+    options = {
+        'ticks_per_frame': int(section.get('ticks_per_frame', 1)),
+        'target_tps': float(section.get('target_tps', 0)),
+        'gene_every': int(section.get('gene_every', 10)),
+    }
+    if options['gene_every'] < 1:
+        raise ValueError(f"gene_every should be at least 1 frame, not {options['gene_every']}")
+    return options
+
+def simulation_from_config(config, engine=None, seed=None):
+    """
+    build_simulation with every section of a config.ini style mapping
+    """
+    prey_evolution = config["Prey_Evolution"] if "Prey_Evolution" in config else None
+    pred_evolution = config["Predator_Evolution"] if "Predator_Evolution" in config else None
+
+    return build_simulation(config["World_Values"], config["Prey_Values"], config["Predator_Values"], engine,
+                            prey_evolution, pred_evolution, seed)
+
+def run_history(sim, itterations, history=None, checkpoint_path=None, checkpoint_every=0, monitor=None):
+    """
+    Ticks the simulation and records the average of every prey gene after each tick.
+    Pass the history from a checkpoint to keep adding to it, and a checkpoint_path to
+    save the run every checkpoint_every ticks. With a Convergence_Monitor the run stops
+    as soon as it reports every gene settled, itterations is then the most it will run.
+    """
+    history = defaultdict(list, history or {})
 
     for _ in range(itterations):
         sim.tick()
         
-        for param in gene_names:
-            values = [getattr(b.genome, param) for b in sim.prey_population]
-            avg_value = np.mean(values)
+        averages = sim.prey_gene_averages()
+        for param, avg_value in averages.items():
             history[param].append(avg_value)
+
+        if checkpoint_every and sim.tick_count % checkpoint_every == 0:
+            save_checkpoint(sim, checkpoint_path, history)
+
+        if monitor is not None and monitor.update(sim.tick_count, averages, sim.gene_stats.variance()):
+            break
+
+    return history
+
+def convergence_monitor(config, gene_names):
+    """
+    Convergence_Monitor from the [Convergence] section, None if it's missing or window is 0
+    """
+    section = config['Convergence'] if 'Convergence' in config else {}
+    window = int(section.get('window', 0))
+    if window <= 0:
+        return None
+    return Convergence_Monitor(gene_names, window, float(section.get('tolerance', 0.1)),
+                               int(section.get('patience', 3)), int(section.get('min_ticks', 5000)))
+
+def fast_sim(sim, itterations, history=None, checkpoint_path=None, checkpoint_every=0, monitor=None):
+    gene_names = sim.gene_names
+    
+    start_time = time.perf_counter()
+
+    history = run_history(sim, itterations, history, checkpoint_path, checkpoint_every, monitor)
     
     end_time = time.perf_counter()
 
     elapsed_time = end_time - start_time
     print(f"Runtime: {elapsed_time:0.4f} seconds") 
 
+    if monitor is not None:
+        if monitor.stop_tick is not None:
+            print(f"Converged at tick {monitor.stop_tick}, stopped early")
+        else:
+            print(f"Not converged after {sim.tick_count} ticks")
+
     plot_evolution(history, gene_names, itterations)
 
+def profile_sim(sim, itterations, out_path=None):
+    """
+    Runs without recording history and prints where the time in each tick went
+    """
+    prof = sim.enable_profiling()
+
+    for _ in range(itterations):
+        sim.tick()
+
+    print(prof.table())
+    if out_path:
+        prof.dump(out_path)
+        print(f"Profile written to {out_path}")
+
+def headless_sim(sim, itterations, out_dir, chunk_size=10000, fmt='npz'):
+    """
+    fast_sim without the plot: gene averages are streamed to out_dir every chunk_size
+    ticks so memory use stays flat however long the run is. Load them back with
+    recording.read_history.
+    """
+    start_time = time.perf_counter()
+
+    with History_Writer(out_dir, sim.gene_names, chunk_size, fmt) as writer:
+        for _ in range(itterations):
+            sim.tick()
+            writer.append(sim.prey_gene_averages())
+
+    end_time = time.perf_counter()
+
+    elapsed_time = end_time - start_time
+    print(f"Runtime: {elapsed_time:0.4f} seconds")
+    print(f"History written to {out_dir}")
+
+def record_sim(sim, itterations, out_dir):
+    """
+    Runs headless while recording every tick's positions, velocities, births and
+    genomes to out_dir, for replay or analysis with recording.Trajectory
+    """
+    start_time = time.perf_counter()
+
+    with Trajectory_Writer(out_dir, sim) as recorder:
+        for _ in range(itterations):
+            sim.tick()
+            recorder.record()
+
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Runtime: {elapsed_time:0.4f} seconds")
+    print(f"Trajectory written to {out_dir}")
+
+def log_events(sim, itterations, out_dir):
+    """
+    Runs headless while logging every prey birth (with both parents) and death
+    (with its predator) to out_dir, read back with recording.read_events
+    """
+    start_time = time.perf_counter()
+
+    with Event_Log(out_dir, sim) as log:
+        for _ in range(itterations):
+            sim.tick()
+            log.record()
+
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Runtime: {elapsed_time:0.4f} seconds")
+    print(f"Events written to {out_dir}")
+
+def replay(out_dir, start_tick=None, ticks_per_frame=1):
+    """
+    Plays a recorded trajectory back from start_tick without simulating anything
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    trajectory = Trajectory(out_dir)
+    first = trajectory.first_tick if start_tick is None else start_tick
+    last = trajectory.first_tick + len(trajectory) - 1
+    trajectory.frame(first) # Fail early if it wasn't recorded
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.set_xlim(*trajectory.bounds[:2])
+    ax.set_ylim(*trajectory.bounds[2:])
+    ax.set_title(f'Replay of {out_dir}')
+
+    prey_scat = ax.scatter([], [], c='blue', label='Prey', s=20, animated=True)
+    pred_scat = ax.scatter([], [], c='red', label='Predators', s=30, animated=True)
+    status = ax.text(0.01, 0.99, '', transform=ax.transAxes, va='top', animated=True)
+    ax.legend()
+
+    def update(tick):
+        prey_scat.set_offsets(trajectory.prey_states(tick)[0, :, :2])
+        pred_scat.set_offsets(trajectory.predator_states(tick)[0, :, :2])
+        status.set_text(f'Tick {tick} of {last}')
+        return [prey_scat, pred_scat, status]
+
+    ani = FuncAnimation(fig, update, frames=range(first, last + 1, ticks_per_frame), interval=30, blit=True)
+    plt.show()
+
 def plot_evolution(history, gene_names, iterations):
     """
     Create subplots showing evolution of each parameter over time
 
     NOTE: Same as above this is plotting is generated with Claude for now
     """
+    import matplotlib.pyplot as plt
+
     num_params = len(gene_names)
     
     # Calculate grid dimensions
@@ -247,8 +742,6 @@ if __name__ == "__main__":
     except configparser.Error as e:
         print(f"Error reading config file: {e}")
 
-    sim = Simulation(config["World_Values"], config["Prey_Values"], config["Predator_Values"])
-   
     if len(sys.argv) > 1:
         match sys.argv[1]:
             case 'fast_sim':
@@ -257,9 +750,85 @@ if __name__ == "__main__":
                 except:
                     print("number of itterations misformated or not put. Default: 10,000")
                     itter = 10000
-                fast_sim(sim, itter)
+
+                engine = sys.argv[3] if len(sys.argv) > 3 else None # Falls back to the config engine
+                checkpoint_path = sys.argv[4] if len(sys.argv) > 4 else None
+                checkpoint_every = int(sys.argv[5]) if len(sys.argv) > 5 else (1000 if checkpoint_path else 0)
+
+                sim = simulation_from_config(config, engine)
+                fast_sim(sim, itter, None, checkpoint_path, checkpoint_every, convergence_monitor(config, sim.gene_names))
+            case 'profile':
+                try:
+                    itter = int(sys.argv[2])
+                except:
+                    print("number of itterations misformated or not put. Default: 1,000")
+                    itter = 1000
+
+                engine = sys.argv[3] if len(sys.argv) > 3 else None
+                out_path = sys.argv[4] if len(sys.argv) > 4 else None
+                sim = simulation_from_config(config, engine)
+                profile_sim(sim, itter, out_path)
+            case 'resume':
+                checkpoint_path = sys.argv[2]
+                try:
+                    itter = int(sys.argv[3])
+                except:
+                    print("number of itterations misformated or not put. Default: 10,000")
+                    itter = 10000
+                checkpoint_every = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+
+                sim, history = load_checkpoint(checkpoint_path)
+                print(f"Resuming from tick {sim.tick_count}")
+                fast_sim(sim, itter, history, checkpoint_path, checkpoint_every, convergence_monitor(config, sim.gene_names))
+            case 'serve':
+                port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+                engine = sys.argv[3] if len(sys.argv) > 3 else None
+                options = real_time_options(config)
+
+                from viewer import serve # asyncio and the server are only needed here
+
+                sim = simulation_from_config(config, engine)
+                serve(sim, port=port, ticks_per_frame=options['ticks_per_frame'], gene_every=options['gene_every'])
+            case 'record':
+                try:
+                    itter = int(sys.argv[2])
+                except:
+                    print("number of itterations misformated or not put. Default: 10,000")
+                    itter = 10000
+
+                out_dir = sys.argv[3] if len(sys.argv) > 3 else 'trajectory'
+                engine = sys.argv[4] if len(sys.argv) > 4 else None
+                sim = simulation_from_config(config, engine)
+                record_sim(sim, itter, out_dir)
+            case 'events':
+                try:
+                    itter = int(sys.argv[2])
+                except:
+                    print("number of itterations misformated or not put. Default: 10,000")
+                    itter = 10000
+
+                out_dir = sys.argv[3] if len(sys.argv) > 3 else 'events'
+                engine = sys.argv[4] if len(sys.argv) > 4 else None
+                sim = simulation_from_config(config, engine)
+                log_events(sim, itter, out_dir)
+            case 'replay':
+                out_dir = sys.argv[2] if len(sys.argv) > 2 else 'trajectory'
+                start_tick = int(sys.argv[3]) if len(sys.argv) > 3 else None
+                replay(out_dir, start_tick, real_time_options(config)['ticks_per_frame'])
+            case 'headless':
+                try:
+                    itter = int(sys.argv[2])
+                except:
+                    print("number of itterations misformated or not put. Default: 10,000")
+                    itter = 10000
+
+                out_dir = sys.argv[3] if len(sys.argv) > 3 else 'history'
+                fmt = sys.argv[4] if len(sys.argv) > 4 else 'npz'
+                sim = simulation_from_config(config)
+                headless_sim(sim, itter, out_dir, fmt=fmt)
             case _: # Also counts for if they put 'real_time'
-                gene_names = list(vars(sim.prey_population[0].genome).keys())
+                sim = simulation_from_config(config)
+                gene_names = sim.gene_names
                 
                 try:
                     gene_display_list = sys.argv[2:]
@@ -278,9 +847,10 @@ if __name__ == "__main__":
 
                 # Add choosing graph parameters here
 
-                real_time(sim, genome_params)
+                real_time(sim, genome_params, **real_time_options(config))
 
         sys.exit(0) # end the script
 
+    sim = simulation_from_config(config)
     genome_params = ['centering_factor', 'predator_turn_factor', 'speed_pref']
-    real_time(sim, genome_params) # Default Behavoir 
+    real_time(sim, genome_params, **real_time_options(config)) # Default Behavoir 